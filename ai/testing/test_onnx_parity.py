@@ -0,0 +1,47 @@
+import os
+import sys
+import numpy as np
+from PIL import Image
+from ultralytics import YOLO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+from ai_util.onnx_doc import OnnxClassifier
+
+# Checks that the ONNX export (ai/train/export_onnx.py) gives the same
+# probabilities as the PyTorch model on a folder of fixture images, e.g. a
+# few documents and non-documents from the validation split.
+
+pt_model_path = r"../../backend/ai_util/document_classifier_v3.pt" # Path to the PyTorch model.
+onnx_model_path = r"../../backend/ai_util/document_classifier_v3.onnx" # Path to the exported model (or the .int8.onnx one).
+folder = r"" # Path to the folder with the fixture images.
+
+# Max absolute difference of a probability. INT8 models drift more, use ~0.05 for them.
+TOLERANCE = 1e-3
+
+valid_ext = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+pt_model = YOLO(pt_model_path)
+onnx_model = OnnxClassifier(onnx_model_path)
+
+worst = 0.0
+checked = 0
+
+for filename in sorted(os.listdir(folder)):
+    if os.path.splitext(filename)[1].lower() not in valid_ext:
+        continue
+
+    img = Image.open(os.path.join(folder, filename)).convert("RGB")
+
+    expected = np.array(pt_model(img, verbose=False)[0].probs.data.tolist()[:2])
+    actual = np.array(onnx_model([img])[0])
+
+    diff = float(np.abs(expected - actual).max())
+    worst = max(worst, diff)
+    checked += 1
+
+    print(f"{filename}: torch {expected[0]:.4f} / onnx {actual[0]:.4f} (diff {diff:.5f})")
+    assert diff <= TOLERANCE, f"{filename}: probabilities differ by {diff:.5f} (tolerance {TOLERANCE})"
+    assert expected.argmax() == actual.argmax(), f"{filename}: the predicted class differs"
+
+assert checked, "No fixture images found."
+print(f"\n{checked} images match, worst difference {worst:.5f}.")
@@ -0,0 +1,32 @@
+import os
+from ultralytics import YOLO
+from onnxruntime.quantization import QuantType, quantize_dynamic
+
+# Exports the trained classifier to ONNX for CPU inference with ONNX Runtime
+# (CLASSIFIER_BACKEND=onnx in the backend), so the classifier worker needs
+# neither torch nor ultralytics.
+#
+# The batch dimension is dynamic, so the worker's micro-batches run in one
+# pass. With QUANTIZE the weights are also stored as INT8 (dynamic
+# quantization): a ~4x smaller file and faster CPU inference for a small
+# accuracy cost. Check both with ai/testing/test_onnx_parity.py before
+# deploying.
+
+model_path = r"./runs/classify/train/weights/best.pt" # Path to where the 'best.pt' model of the latest train exists (or backend/ai_util/document_classifier_v3.pt).
+output_dir = r"../backend/ai_util" # Where the exported models are written.
+
+QUANTIZE = True
+
+model = YOLO(model_path)
+exported = model.export(format="onnx", imgsz=224, dynamic=True, simplify=True, opset=17)
+
+onnx_path = os.path.join(output_dir, "document_classifier_v3.onnx")
+os.replace(exported, onnx_path)
+print(f"ONNX model: {onnx_path} ({os.path.getsize(onnx_path) / 1e6:.1f} MB)")
+
+if QUANTIZE:
+    int8_path = os.path.join(output_dir, "document_classifier_v3.int8.onnx")
+    quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QInt8)
+    print(f"INT8 model: {int8_path} ({os.path.getsize(int8_path) / 1e6:.1f} MB)")
+
+print("Export complete!")
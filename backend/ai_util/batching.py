@@ -0,0 +1,100 @@
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+# Dynamic micro-batching.
+#
+# Requests are queued and a single thread drains the queue into batches: it
+# waits for the first image, then keeps collecting until max_batch_size
+# images are queued or max_wait_ms have passed since the first one, and runs
+# the whole batch in one forward pass. Under load batches fill up and the
+# per-image cost drops; when idle a lone image waits at most max_wait_ms.
+#
+# Every submit() returns a Future resolved with that image's result.
+
+
+class MicroBatcher:
+    def __init__(self, run_batch, max_batch_size=16, max_wait_ms=10):
+        self._run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._images = 0
+        self._failed_batches = 0
+        self._max_queue_depth = 0
+        self._wait_seconds = 0.0
+        self._inference_seconds = 0.0
+
+        self._thread = threading.Thread(target=self._loop, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        future = Future()
+        self._queue.put((item, future, time.monotonic()))
+
+        depth = self._queue.qsize()
+        if depth > self._max_queue_depth:
+            with self._stats_lock:
+                self._max_queue_depth = max(self._max_queue_depth, depth)
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _, _ in batch]
+            started = time.monotonic()
+
+            try:
+                results = self._run_batch(items)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                with self._stats_lock:
+                    self._failed_batches += 1
+                continue
+
+            finished = time.monotonic()
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+            with self._stats_lock:
+                self._batch_sizes[len(batch)] += 1
+                self._images += len(batch)
+                self._wait_seconds += sum(started - queued_at for _, _, queued_at in batch)
+                self._inference_seconds += finished - started
+
+    def metrics(self):
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": batches,
+                "failed_batches": self._failed_batches,
+                "images": self._images,
+                "mean_batch_size": round(self._images / batches, 2) if batches else 0,
+                "batch_sizes": {str(size): n for size, n in sorted(self._batch_sizes.items())},
+                "mean_wait_ms": round(self._wait_seconds / self._images * 1000, 2) if self._images else 0,
+                "mean_batch_ms": round(self._inference_seconds / batches * 1000, 2) if batches else 0,
+            }
@@ -0,0 +1,68 @@
+import socket
+
+from django.conf import settings
+
+from .decode import ImageRejected, check_size
+from .protocol import ProtocolError, recv_json, send_frame
+
+# Client of the document classifier.
+#
+# When CLASSIFIER_SOCKET is set, images are sent to the classifier worker
+# (`python manage.py run_classifier`) over that Unix socket and the web
+# process never imports torch. Without it (local development) the model is
+# loaded lazily in-process on the first call.
+
+
+class ClassifierUnavailable(Exception):
+    pass
+
+
+class InvalidImage(Exception):
+    pass
+
+
+def _request(path, payload):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(settings.CLASSIFIER_TIMEOUT)
+            sock.connect(path)
+            send_frame(sock, payload)
+            return recv_json(sock)
+    except (OSError, ProtocolError, ValueError) as e:
+        raise ClassifierUnavailable(f"Classifier worker unreachable: {e}") from e
+
+
+def classify_document(image_file):
+    """(document, nondocument) probabilities of an uploaded image."""
+    path = settings.CLASSIFIER_SOCKET
+
+    if not path:
+        from .predict_doc import classify_document as classify_local
+
+        try:
+            return classify_local(image_file)
+        except ImageRejected as e:
+            raise InvalidImage(str(e)) from e
+
+    # don't ship what the worker would refuse anyway
+    try:
+        check_size(image_file.size)
+    except ImageRejected as e:
+        raise InvalidImage(str(e)) from e
+
+    image_file.seek(0)
+    response = _request(path, image_file.read())
+
+    if response.get("code") == "invalid_image":
+        raise InvalidImage(response["error"])
+    if "error" in response:
+        raise ClassifierUnavailable(response["error"])
+    return response["document"], response["nondocument"]
+
+
+def classifier_metrics(path=None):
+    """Queue depth and batch size metrics of the classifier worker."""
+    path = path or settings.CLASSIFIER_SOCKET
+    if not path:
+        raise ClassifierUnavailable("CLASSIFIER_SOCKET is not set.")
+    return _request(path, b"")
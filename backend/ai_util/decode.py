@@ -0,0 +1,76 @@
+import math
+
+from PIL import Image, UnidentifiedImageError
+
+# Bounded image decoding for the classifier.
+#
+# The model only ever sees IMGSZ x IMGSZ pixels, so uploads are brought down
+# to that size while they are decoded instead of after. JPEGs (most phone
+# photos) are decoded at 1/2, 1/4 or 1/8 scale in the DCT domain via
+# draft(); other formats are shrunk with reduce() right after loading.
+# Either way the shorter side stays >= IMGSZ, and the final resize + center
+# crop is the same one ultralytics applies, so the model's input only
+# differs from a full decode by resampling noise. Uploads over
+# MAX_FILE_BYTES, or whose header announces more than MAX_PIXELS, are
+# rejected before any pixel is decoded.
+
+IMGSZ = 224
+MAX_FILE_BYTES = 15 * 1024 * 1024
+MAX_PIXELS = 50_000_000
+
+
+class ImageRejected(ValueError):
+    pass
+
+
+def check_size(nbytes, max_bytes=MAX_FILE_BYTES):
+    if nbytes > max_bytes:
+        raise ImageRejected(f"The image is larger than {max_bytes // (1024 * 1024)} MB.")
+
+
+def fit(img, size=IMGSZ):
+    """Resize the shorter side to size (bilinear) and center crop size x size."""
+    width, height = img.size
+    if (width, height) == (size, size):
+        return img
+
+    if width <= height:
+        new_size = (size, int(size * height / width))
+    else:
+        new_size = (int(size * width / height), size)
+    img = img.resize(new_size, Image.BILINEAR)
+
+    left = int(round((new_size[0] - size) / 2.0))
+    top = int(round((new_size[1] - size) / 2.0))
+    return img.crop((left, top, left + size, top + size))
+
+
+def open_image(fp, size=IMGSZ, max_pixels=MAX_PIXELS):
+    """The size x size RGB image the classifier sees, decoded at the lowest scale that allows it."""
+    try:
+        img = Image.open(fp)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise ImageRejected("The file is not a readable image.") from e
+
+    width, height = img.size
+    if width * height > max_pixels:
+        raise ImageRejected(f"The image is larger than {max_pixels // 1_000_000} megapixels.")
+
+    # ratio by which the image may shrink with the shorter side still >= size
+    scale = min(width, height) / size
+
+    try:
+        if img.format == "JPEG" and scale >= 2:
+            img.draft("RGB", (math.ceil(width / scale), math.ceil(height / scale)))
+        img.load()
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")  # palette, CMYK, 16 bit... (alpha is dropped, as before)
+
+        factor = int(min(img.size) / size)  # what draft() didn't already do
+        if factor >= 2:
+            img = img.reduce(factor)
+        img = img.convert("RGB")
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageRejected("The file is not a readable image.") from e
+
+    return fit(img, size)
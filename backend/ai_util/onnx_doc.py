@@ -0,0 +1,56 @@
+import numpy as np
+
+from .decode import fit
+
+# ONNX Runtime backend of the document classifier.
+#
+# Runs the model exported by ai/train/export_onnx.py (optionally INT8
+# quantized) on the CPU without torch or ultralytics. Preprocessing mirrors
+# ultralytics' classify transforms: resize the shorter side to IMGSZ
+# (bilinear), center crop IMGSZ x IMGSZ (decode.fit), scale to [0, 1], RGB,
+# CHW. The exported graph ends in the softmax, so its output are the
+# probabilities.
+
+
+def preprocess(img):
+    """float32 CHW array in [0, 1] of a PIL RGB image, as ultralytics feeds the model."""
+    return np.asarray(fit(img), dtype=np.float32).transpose(2, 0, 1) / 255.0
+
+
+class OnnxClassifier:
+    def __init__(self, path, threads=0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        # 0 lets onnxruntime use every core; set it when several inference
+        # processes share a node
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+        # a static export only takes batches of the size it was exported with
+        batch = self.session.get_inputs()[0].shape[0]
+        self.batch_size = batch if isinstance(batch, int) else None
+
+    def _run(self, batch):
+        return self.session.run(None, {self.input_name: batch})[0]
+
+    def __call__(self, imgs):
+        batch = np.stack([preprocess(img) for img in imgs])
+
+        if self.batch_size is None:
+            probs = self._run(batch)
+        else:
+            chunks = []
+            for i in range(0, len(batch), self.batch_size):
+                chunk = batch[i:i + self.batch_size]
+                padding = self.batch_size - len(chunk)
+                if padding:
+                    chunk = np.concatenate([chunk, np.zeros((padding, *chunk.shape[1:]), chunk.dtype)])
+                chunks.append(self._run(chunk)[:self.batch_size - padding])
+            probs = np.concatenate(chunks)
+
+        return [(float(p[0]), float(p[1])) for p in probs]
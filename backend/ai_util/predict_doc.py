@@ -1,18 +1,119 @@
 import os
-import torch
-from ultralytics import YOLO
-from PIL import Image
+import threading
+
+import numpy as np
+
+from .decode import check_size, open_image
+from .onnx_doc import preprocess
+from .result_cache import ResultCache, file_version, image_key
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(BASE_DIR, "document_classifier_v3.pt")
+ONNX_MODEL_PATH = os.path.join(BASE_DIR, "document_classifier_v3.onnx")
+
+# The model is loaded on first use, not at import time, so importing this
+# module stays cheap. In production it lives in the classifier worker
+# (worker.py) and web processes never load it.
+#
+# CLASSIFIER_BACKEND picks the runtime: "torch" runs the ultralytics .pt
+# model, "onnx" the export of ai/train/export_onnx.py on ONNX Runtime, which
+# needs neither torch nor ultralytics. CLASSIFIER_THREADS caps the threads
+# one forward pass uses (0 = all cores).
+#
+# Uploads are decoded straight to the model's IMGSZ x IMGSZ input
+# (decode.py) and results are cached by image content and model version
+# (result_cache.py).
+_model = None
+_version = None
+_cache = None
+_lock = threading.Lock()
+
+
+def _load_torch(threads):
+    import torch
+    from ultralytics import YOLO
+
+    if threads:
+        torch.set_num_threads(threads)
+
+    model = YOLO(MODEL_PATH)
+    model.to("cuda" if torch.cuda.is_available() else "cpu")
+
+    def classify(imgs):
+        # the images are already IMGSZ x IMGSZ (decode.py), so they go in as
+        # one tensor and ultralytics doesn't resize or convert them again
+        batch = torch.from_numpy(np.stack([preprocess(img) for img in imgs]))
+        results = model(batch, verbose=False)
+        return [(float(r.probs.data[0]), float(r.probs.data[1])) for r in results]
+
+    return classify
+
+
+def _load_onnx(threads):
+    from .onnx_doc import OnnxClassifier
+
+    return OnnxClassifier(_onnx_path(), threads)
+
+
+def _onnx_path():
+    from django.conf import settings
+
+    return settings.CLASSIFIER_ONNX_PATH or ONNX_MODEL_PATH
+
+
+def get_model():
+    global _model, _version
+
+    if _model is None:
+        with _lock:
+            if _model is None:
+                from django.conf import settings
+
+                if settings.CLASSIFIER_BACKEND == "onnx":
+                    load, path = _load_onnx, _onnx_path()
+                else:
+                    load, path = _load_torch, MODEL_PATH
+
+                _version = file_version(path)
+                _model = load(settings.CLASSIFIER_THREADS)
+
+    return _model
+
+
+def model_version():
+    """Version of the loaded model file, part of every result cache key."""
+    get_model()
+    return _version
+
+
+def _get_cache():
+    global _cache
+
+    if _cache is None:
+        from django.conf import settings
+
+        _cache = ResultCache(settings.CLASSIFIER_CACHE_SIZE)
+    return _cache
+
+
+def classify_images(imgs):
+    """(document, nondocument) of every image, in one forward pass."""
+    return get_model()(imgs)
+
+
+def classify_image(img):
+    return classify_images([img])[0]
 
-model = YOLO(MODEL_PATH)
-device = "cuda" if torch.cuda.is_available() else "cpu"
-model.to(device)
 
 def classify_document(image_file):
-    img = Image.open(image_file).convert("RGB")
-    results = model(img)
+    check_size(image_file.size)
+    img = open_image(image_file)
+
+    cache = _get_cache()
+    key = image_key(img, model_version())
+    result = cache.get(key)
 
-    probs = results[0].probs.data.tolist()
-    return float(probs[0]), float(probs[1])
+    if result is None:
+        result = classify_image(img)
+        cache.put(key, result)
+    return result
@@ -0,0 +1,56 @@
+import json
+import struct
+
+# Wire format between the web processes and the classifier worker: every
+# message is a 4 byte big-endian length followed by the payload. Requests
+# carry the raw uploaded file, responses a JSON object, either
+# {"document": float, "nondocument": float} or {"error": str} (with
+# "code": "invalid_image" when the file isn't an image or is too large). An
+# empty request is answered with the worker's batching and cache metrics.
+
+HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 32 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise ProtocolError("Connection closed mid-message.")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_frame(sock, payload):
+    sock.sendall(HEADER.pack(len(payload)) + payload)
+
+
+def recv_frame(sock):
+    """The next payload, or None if the peer closed the connection cleanly."""
+    header = sock.recv(HEADER.size, 0)
+    if not header:
+        return None
+    if len(header) < HEADER.size:
+        header += _recv_exactly(sock, HEADER.size - len(header))
+
+    (size,) = HEADER.unpack(header)
+    if size > MAX_FRAME_BYTES:
+        raise ProtocolError(f"Message of {size} bytes is too large.")
+    return _recv_exactly(sock, size)
+
+
+def send_json(sock, data):
+    send_frame(sock, json.dumps(data).encode())
+
+
+def recv_json(sock):
+    payload = recv_frame(sock)
+    if payload is None:
+        raise ProtocolError("Connection closed before a response.")
+    return json.loads(payload)
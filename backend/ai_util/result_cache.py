@@ -0,0 +1,65 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# Classification result cache.
+#
+# Users re-upload the same photo (retries, front/back re-sent on profile
+# edits), so results are cached under a SHA-256 of the decoded pixels plus
+# the model version. Identical images skip inference whatever their file
+# name or container metadata, and a different model file changes every key.
+# The cache is a bounded LRU in the process that holds the model.
+
+
+def file_version(path):
+    """Version of a model file: changes whenever the file is replaced."""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def image_key(img, version):
+    digest = hashlib.sha256()
+    digest.update(f"{version}|{img.mode}|{img.size[0]}x{img.size[1]}|".encode())
+    digest.update(img.tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def metrics(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+            }
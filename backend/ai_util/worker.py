@@ -0,0 +1,92 @@
+import io
+import logging
+import os
+import socketserver
+
+from .batching import MicroBatcher
+from .decode import ImageRejected, check_size, open_image
+from .protocol import ProtocolError, recv_frame, send_json
+from .result_cache import ResultCache, image_key
+
+logger = logging.getLogger(__name__)
+
+# Classifier worker.
+#
+# One long-lived process holds the model and serves the web processes over
+# a Unix socket (protocol.py). Each connection gets a thread that decodes
+# its image straight to the model's input size (decode.py), answers from
+# the result cache when the same pixels were seen with this model before
+# (result_cache.py), and otherwise hands it to a MicroBatcher, which runs
+# the model on batches of concurrent requests (batching.py). An empty
+# request asks for the batching and cache metrics.
+
+
+class ClassifierHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                data = recv_frame(self.request)
+            except (OSError, ProtocolError):
+                return
+            if data is None:
+                return
+
+            response = self.server.metrics() if not data else self.server.classify(data)
+            try:
+                send_json(self.request, response)
+            except OSError:
+                return
+
+
+class ClassifierServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # connects beyond the listen backlog fail outright on Unix sockets
+    # (EAGAIN) instead of waiting, and a signup peak opens many at once
+    request_queue_size = 256
+
+    def __init__(self, path, classify_images, max_batch_size, max_wait_ms, cache_size, model_version):
+        self.batcher = MicroBatcher(classify_images, max_batch_size, max_wait_ms)
+        self.cache = ResultCache(cache_size)
+        self.model_version = model_version
+        super().__init__(path, ClassifierHandler)
+
+    def metrics(self):
+        return {**self.batcher.metrics(), "cache": self.cache.metrics()}
+
+    def classify(self, data):
+        try:
+            check_size(len(data))
+            img = open_image(io.BytesIO(data))
+        except ImageRejected as e:
+            return {"error": str(e), "code": "invalid_image"}
+
+        key = image_key(img, self.model_version)
+        cached = self.cache.get(key)
+        if cached is not None:
+            document, nondocument = cached
+            return {"document": document, "nondocument": nondocument}
+
+        try:
+            document, nondocument = self.batcher.submit(img).result()
+        except Exception:
+            logger.exception("Document classification failed")
+            return {"error": "Classification failed."}
+
+        self.cache.put(key, (document, nondocument))
+
+        return {"document": document, "nondocument": nondocument}
+
+
+def serve(path, classify_images=None, max_batch_size=16, max_wait_ms=10, cache_size=1024, model_version=None):
+    """Load the model and serve classification requests on the Unix socket path."""
+    if classify_images is None:
+        from .predict_doc import classify_images, model_version as loaded_version
+        model_version = loaded_version()  # loads the model before accepting connections
+
+    if os.path.exists(path):
+        os.unlink(path)  # left over from a previous run
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    with ClassifierServer(path, classify_images, max_batch_size, max_wait_ms, cache_size, model_version) as server:
+        os.chmod(path, 0o660)
+        server.serve_forever()
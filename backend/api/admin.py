@@ -13,9 +13,13 @@ admin.site.register([
         JobPost, 
         JobApplication, 
         Attendance,
+        CourseAttendanceRollup,
+        CourseStudentStats,
         Exam,
         Grade,
         InstitutionSubscription,
         CoursePayment,
+        EmailOutbox,
+        ImportJob,
     ]
 )
@@ -0,0 +1,174 @@
+import time
+
+import numpy as np
+from django.core.cache import cache
+
+from .models import Exam, Grade, Student
+
+# Grade analytics.
+#
+# The scores of an exam or a course are loaded with one values_list query
+# straight into NumPy arrays and every statistic is computed on the arrays,
+# not on model instances. Scores are compared as percentages of the exam's
+# max_score, so exams graded out of different totals share one scale.
+#
+# Results are cached per course. Any grade write bumps the course's version
+# (grading.py and the Grade signals), which makes the old entries
+# unreachable instead of deleting them one by one. The versions live in the
+# shared cache, so a bump from the importer or any web worker reaches all.
+
+ANALYTICS_TTL = 60 * 30
+PERCENTILES = (10, 25, 50, 75, 90)
+HISTOGRAM_BINS = 10  # buckets of 10% of max_score
+
+GRADE_ROW = np.dtype([("exam", np.int64), ("student", np.int64), ("score", np.float64), ("max_score", np.float64)])
+
+
+def _version_key(course_id):
+    return f"analytics:version:{course_id}"
+
+
+def get_version(course_id):
+    return cache.get(_version_key(course_id), 0)
+
+
+def bump_version(course_id):
+    # time based, so an evicted key can never come back as an old version
+    cache.set(_version_key(course_id), time.time_ns(), None)
+
+
+def graded_courses(student):
+    """IDs of the courses the student has grades in."""
+    return set(Grade.objects.filter(student=student).values_list("exam__course_id", flat=True))
+
+
+# -------------------------
+# COMPUTATION
+# -------------------------
+
+def summarize(percents):
+    """Distribution statistics of an array of scores in percent of max_score."""
+    if percents.size == 0:
+        return {
+            "count": 0, "mean": None, "median": None, "std": None, "min": None, "max": None,
+            "percentiles": {str(p): None for p in PERCENTILES},
+            "histogram": {"edges": [], "counts": [], "share": []},
+        }
+
+    counts, edges = np.histogram(np.clip(percents, 0, 100), bins=HISTOGRAM_BINS, range=(0, 100))
+
+    return {
+        "count": int(percents.size),
+        "mean": round(float(percents.mean()), 2),
+        "median": round(float(np.median(percents)), 2),
+        "std": round(float(percents.std()), 2),
+        "min": round(float(percents.min()), 2),
+        "max": round(float(percents.max()), 2),
+        "percentiles": {
+            str(p): round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(percents, PERCENTILES))
+        },
+        "histogram": {
+            "edges": [round(float(e), 2) for e in edges],
+            "counts": counts.tolist(),
+            "share": np.round(counts / percents.size, 4).tolist(),
+        },
+    }
+
+
+def course_report(exam_ids, student_ids, scores, max_scores):
+    """
+    Per-exam distributions and per-student weighted averages of one course,
+    from parallel arrays with one entry per grade. A student's average is
+    the sum of their scores over the sum of the max_scores of the exams they
+    sat, so an exam out of 100 weighs twice an exam out of 50.
+    """
+    percents = np.divide(scores, max_scores, out=np.zeros_like(scores), where=max_scores > 0) * 100
+
+    exams = {}
+    if exam_ids.size:
+        order = np.argsort(exam_ids, kind="stable")
+        unique_exams, starts = np.unique(exam_ids[order], return_index=True)
+        for exam_id, group in zip(unique_exams, np.split(percents[order], starts[1:])):
+            exams[int(exam_id)] = summarize(group)
+
+    unique_students, student_index = np.unique(student_ids, return_inverse=True)
+    earned = np.bincount(student_index, weights=scores, minlength=unique_students.size)
+    possible = np.bincount(student_index, weights=max_scores, minlength=unique_students.size)
+    sat = np.bincount(student_index, minlength=unique_students.size)
+    averages = np.divide(earned, possible, out=np.zeros_like(earned), where=possible > 0) * 100
+
+    students = {
+        int(student_id): {"exams_taken": int(n), "weighted_average": round(float(avg), 2)}
+        for student_id, n, avg in zip(unique_students, sat, averages)
+    }
+
+    return {
+        "overall": summarize(percents),
+        "averages": summarize(averages),
+        "exams": exams,
+        "students": students,
+    }
+
+
+# -------------------------
+# LOADING
+# -------------------------
+
+def exam_analytics(exam):
+    key = f"analytics:exam:{exam.id}:{get_version(exam.course_id)}"
+    result = cache.get(key)
+
+    if result is None:
+        scores = np.fromiter(Grade.objects.filter(exam=exam).values_list("score", flat=True), dtype=np.float64)
+        percents = scores / exam.max_score * 100 if exam.max_score else np.zeros_like(scores)
+        result = summarize(percents)
+        cache.set(key, result, ANALYTICS_TTL)
+
+    return result
+
+
+def course_analytics(course):
+    key = f"analytics:course:{course.id}:{get_version(course.id)}"
+    result = cache.get(key)
+
+    if result is None:
+        rows = np.fromiter(
+            Grade.objects.filter(exam__course=course)
+            .values_list("exam_id", "student_id", "score", "exam__max_score")
+            .iterator(chunk_size=10_000),
+            dtype=GRADE_ROW,
+        )
+
+        report = course_report(rows["exam"], rows["student"], rows["score"], rows["max_score"])
+
+        titles = dict(Exam.objects.filter(course=course).values_list("id", "title"))
+        names = {
+            student_id: (username, f"{first} {last}")
+            for student_id, username, first, last in Student.objects.filter(
+                id__in=report["students"].keys()
+            ).values_list("id", "user__username", "user__first_name", "user__last_name")
+        }
+
+        result = {
+            "overall": report["overall"],
+            "student_averages": report["averages"],
+            "exams": [
+                {"exam_id": exam_id, "title": titles.get(exam_id), **stats}
+                for exam_id, stats in report["exams"].items()
+            ],
+            "students": sorted(
+                (
+                    {
+                        "student_id": student_id,
+                        "username": names.get(student_id, (None, None))[0],
+                        "name": names.get(student_id, (None, None))[1],
+                        **stats,
+                    }
+                    for student_id, stats in report["students"].items()
+                ),
+                key=lambda s: -s["weighted_average"],
+            ),
+        }
+        cache.set(key, result, ANALYTICS_TTL)
+
+    return result
@@ -0,0 +1,300 @@
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.utils import timezone
+
+from . import outbox
+from .models import Attendance, Course, CourseAttendanceRollup, CourseStudentStats, Student
+
+# Bulk attendance marking.
+#
+# A lecture's attendance is saved as a set: the submitted usernames are
+# resolved with one query and every row for (course, lecture_number) is
+# written with a single INSERT ... ON CONFLICT DO UPDATE. The statuses the
+# rows had before are read in the same transaction, so callers learn which
+# students actually changed, e.g. to notify only the newly absent ones and
+# not everyone absent each time a lecture is re-submitted.
+#
+# The course row is locked for the duration, which serializes concurrent
+# submissions for a course and keeps the before/after diff exact. The same
+# diff moves the course's CourseAttendanceRollup totals and the
+# CourseStudentStats counters of every student in the submission.
+
+REJECT_NOT_ENROLLED = "not_enrolled"
+REJECT_DUPLICATE = "duplicate"  # a later row for the same student wins
+
+
+def mark_lecture(course, lecture_number, records):
+    """
+    Upsert the {"username", "status"} records for one lecture of course.
+    Returns the per-record results and the students whose status changed
+    to absent.
+    """
+    usernames = [record["username"] for record in records]
+
+    students = {
+        student.user.username: student
+        for student in Student.objects.filter(
+            courses=course, user__username__in=set(usernames)
+        ).select_related("user")
+    }
+
+    last_index = {username: i for i, username in enumerate(usernames) if username in students}
+
+    results = []
+    marked = {}
+    for i, record in enumerate(records):
+        username = record["username"]
+        reason = None
+
+        if username not in students:
+            reason = REJECT_NOT_ENROLLED
+        elif last_index[username] != i:
+            reason = REJECT_DUPLICATE
+        else:
+            marked[students[username].id] = record["status"]
+
+        results.append({
+            "username": username,
+            "status": record["status"],
+            "accepted": reason is None,
+            "reason": reason,
+            "changed": False,
+        })
+
+    if not marked:
+        return results, []
+
+    with transaction.atomic():
+        Course.objects.select_for_update().only("id").get(pk=course.pk)
+
+        previous = dict(
+            Attendance.objects.filter(
+                course=course, lecture_number=lecture_number, student_id__in=marked
+            ).values_list("student_id", "status")
+        )
+
+        Attendance.objects.bulk_create(
+            [
+                Attendance(course=course, student_id=student_id, lecture_number=lecture_number, status=status)
+                for student_id, status in marked.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["course", "student", "lecture_number"],
+            update_fields=["status"],
+        )
+
+        present_delta = absent_delta = 0
+        for student_id, status in marked.items():
+            before = previous.get(student_id)
+            present_delta += (status == "present") - (before == "present")
+            absent_delta += (status == "absent") - (before == "absent")
+
+        _shift_rollup(course, present_delta, absent_delta)
+        _update_student_stats(course, lecture_number, previous, marked)
+
+    for result in results:
+        if result["accepted"]:
+            student_id = students[result["username"]].id
+            result["changed"] = previous.get(student_id) != marked[student_id]
+
+    newly_absent = [
+        students[result["username"]]
+        for result in results
+        if result["accepted"] and result["changed"] and result["status"] == "absent"
+    ]
+
+    return results, newly_absent
+
+
+def absence_emails(course, lecture_number, students):
+    """Unsaved outbox emails alerting students (and responsibles) of an absence."""
+    emails = []
+
+    for student in students:
+        subject = f"Attendance Alert - {course.title} Lecture {lecture_number}"
+        msg = (
+            f"Dear {student.user.first_name},\n\n"
+            f"You were marked absent for lecture {lecture_number} of '{course.title}'.\n"
+            f"Please make sure to catch up.\n\nBest regards."
+        )
+        recipients = [student.user.email]
+        if student.responsible_email:
+            recipients.append(student.responsible_email)
+
+        emails.append(outbox.build(subject, msg, recipients))
+
+    return emails
+
+
+# -------------------------
+# ROLLUPS
+# -------------------------
+
+def counts(queryset):
+    """present/absent totals of an Attendance queryset, in one query."""
+    return queryset.aggregate(
+        present=Count("id", filter=Q(status="present")),
+        absent=Count("id", filter=Q(status="absent")),
+    )
+
+
+def counts_by_course(queryset):
+    """counts() per course_id, in one grouped query."""
+    return queryset.values("course_id").annotate(
+        present=Count("id", filter=Q(status="present")),
+        absent=Count("id", filter=Q(status="absent")),
+    ).order_by()
+
+
+def rebuild_rollup(course):
+    totals = counts(Attendance.objects.filter(course=course))
+    rollup, _ = CourseAttendanceRollup.objects.update_or_create(course=course, defaults=totals)
+    return rollup
+
+
+def get_rollup(course):
+    try:
+        return course.attendance_rollup
+    except CourseAttendanceRollup.DoesNotExist:
+        return rebuild_rollup(course)
+
+
+def _shift_rollup(course, present_delta, absent_delta):
+    updated = CourseAttendanceRollup.objects.filter(course=course).update(
+        present=F("present") + present_delta,
+        absent=F("absent") + absent_delta,
+        updated_at=timezone.now(),
+    )
+    # first attendance of the course (the new rows are already counted)
+    if not updated:
+        rebuild_rollup(course)
+
+
+def discount(record):
+    """Take a deleted Attendance row out of its course's rollup."""
+    if record.status in ("present", "absent"):
+        CourseAttendanceRollup.objects.filter(course_id=record.course_id).update(
+            **{record.status: F(record.status) - 1},
+            updated_at=timezone.now(),
+        )
+
+
+def forget(record):
+    """
+    Take a deleted Attendance row out of the rollup and its student's stats,
+    under the same course lock mark_lecture writes them with.
+    """
+    with transaction.atomic():
+        list(Course.objects.select_for_update().filter(pk=record.course_id).values_list("id", flat=True))
+        discount(record)
+        recount_student_stats(record)
+
+
+def discount_student(student):
+    """Take all of a deleted student's rows out of their courses' rollups."""
+    records = Attendance.objects.filter(student=student)
+
+    with transaction.atomic():
+        # in id order, so this can't deadlock with the rebuild command
+        list(
+            Course.objects.select_for_update()
+            .filter(pk__in=records.values("course_id"))
+            .order_by("id").values_list("id", flat=True)
+        )
+        for row in counts_by_course(records):
+            CourseAttendanceRollup.objects.filter(course_id=row["course_id"]).update(
+                present=F("present") - row["present"],
+                absent=F("absent") - row["absent"],
+                updated_at=timezone.now(),
+            )
+
+
+def percentage(present, total_lectures):
+    return present / total_lectures * 100 if total_lectures else 0
+
+
+def _update_student_stats(course, lecture_number, previous, marked):
+    current = {
+        stats.student_id: stats
+        for stats in CourseStudentStats.objects.filter(course=course, student_id__in=marked)
+    }
+
+    rows = []
+    for student_id, status in marked.items():
+        stats = current.get(student_id) or CourseStudentStats(course=course, student_id=student_id)
+        before = previous.get(student_id)
+
+        stats.present += (status == "present") - (before == "present")
+        stats.absent += (status == "absent") - (before == "absent")
+        stats.last_lecture = max(stats.last_lecture or 0, lecture_number)
+        stats.percentage = percentage(stats.present, course.total_lectures)
+        rows.append(stats)
+
+    CourseStudentStats.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["course", "student"],
+        update_fields=["present", "absent", "last_lecture", "percentage"],
+    )
+
+
+def get_student_stats(course, student):
+    """The student's counters in course; zeros if nothing was marked yet."""
+    stats = CourseStudentStats.objects.filter(course=course, student=student).first()
+    return stats or CourseStudentStats(course=course, student=student)
+
+
+def enrolled_present(course):
+    """
+    Present marks of the students currently enrolled in course. The rollup
+    still counts students who were unenrolled since, this doesn't.
+    """
+    totals = CourseStudentStats.objects.filter(course=course, student__courses=course).aggregate(
+        present=Sum("present")
+    )
+    return totals["present"] or 0
+
+
+def refresh_percentages(course):
+    """Recompute the stored percentages after course.total_lectures changed."""
+    total = course.total_lectures
+    CourseStudentStats.objects.filter(course=course).update(
+        percentage=F("present") * 100.0 / total if total else 0.0
+    )
+
+
+def student_totals(queryset=None):
+    """
+    Attendance counters per (course, student) computed from the Attendance
+    rows, in one grouped query. This is the ground truth the stats are
+    rebuilt and verified against.
+    """
+    queryset = Attendance.objects.all() if queryset is None else queryset
+    return queryset.values("course_id", "student_id").annotate(
+        present=Count("id", filter=Q(status="present")),
+        absent=Count("id", filter=Q(status="absent")),
+        last_lecture=Max("lecture_number"),
+        total_lectures=F("course__total_lectures"),
+    ).order_by()
+
+
+def recount_student_stats(record):
+    """Recount one (course, student) pair, e.g. after a row was deleted."""
+    totals = student_totals(
+        Attendance.objects.filter(course_id=record.course_id, student_id=record.student_id)
+    ).first()
+
+    if totals is None:
+        CourseStudentStats.objects.filter(course_id=record.course_id, student_id=record.student_id).delete()
+        return
+
+    CourseStudentStats.objects.update_or_create(
+        course_id=record.course_id,
+        student_id=record.student_id,
+        defaults={
+            "present": totals["present"],
+            "absent": totals["absent"],
+            "last_lecture": totals["last_lecture"],
+            "percentage": percentage(totals["present"], totals["total_lectures"]),
+        },
+    )
@@ -0,0 +1,162 @@
+import csv
+import re
+
+from django.http import StreamingHttpResponse
+
+from .models import Attendance, Exam, Grade, Student, phone_validator
+
+# CSV exports.
+#
+# Exports are streamed: rows are read with server-side cursors
+# (.iterator(chunk_size=EXPORT_CHUNK_SIZE)) and written out one CSV line at
+# a time, so memory stays flat however large the roster or course is.
+#
+# Matrices (student x lecture, student x exam) are built by walking two
+# cursors ordered by student id side by side, the enrolled students and the
+# course's attendance/grade rows, instead of loading either into memory.
+
+EXPORT_CHUNK_SIZE = 2000
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# values starting with + or - that are data, not formulas
+NUMBER = re.compile(r"^[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?$")
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the generator."""
+
+    def write(self, value):
+        return value
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    # spreadsheet apps would run user text such as "=HYPERLINK(...)"; phone
+    # numbers (+964...) and signed numbers are left as they are
+    if (
+        isinstance(value, str)
+        and value.startswith(FORMULA_PREFIXES)
+        and not phone_validator.regex.match(value)
+        and not NUMBER.match(value)
+    ):
+        return "'" + value
+    return value
+
+
+def stream_csv(header, rows):
+    writer = csv.writer(_Echo())
+    # BOM, so spreadsheet apps read the file as UTF-8 (Arabic names)
+    yield "\ufeff" + writer.writerow([_cell(value) for value in header])
+    for row in rows:
+        yield writer.writerow([_cell(value) for value in row])
+
+
+def csv_response(file_name, header, rows):
+    response = StreamingHttpResponse(stream_csv(header, rows), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{file_name}"'
+    return response
+
+
+def _join(students, cells):
+    """
+    Pair every (student_id, ...) row with a {column: value} dict of its
+    (student_id, column, value) cells. Both iterables must be ordered by
+    student id; cells of students not in the first one are skipped.
+    """
+    cells = iter(cells)
+    pending = next(cells, None)
+
+    for student in students:
+        row = {}
+        while pending is not None and pending[0] <= student[0]:
+            if pending[0] == student[0]:
+                row[pending[1]] = pending[2]
+            pending = next(cells, None)
+        yield student, row
+
+
+def _course_students(course):
+    return (
+        Student.objects.filter(courses=course)
+        .order_by("id")
+        .values_list("id", "user__username", "user__first_name", "user__last_name")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+# -------------------------
+# EXPORTS
+# -------------------------
+
+STUDENT_HEADER = [
+    "id", "username", "first_name", "last_name", "email", "studying_level",
+    "responsible_phone", "responsible_email",
+]
+
+
+def students_csv(queryset, file_name="students.csv"):
+    rows = (
+        queryset.order_by("id")
+        .values_list(
+            "id", "user__username", "user__first_name", "user__last_name", "user__email",
+            "studying_level", "responsible_phone", "responsible_email",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    return csv_response(file_name, STUDENT_HEADER, rows)
+
+
+def attendance_csv(course):
+    lectures = range(1, course.total_lectures + 1)
+    header = ["student_id", "username", "first_name", "last_name"]
+    header += [f"lecture_{n}" for n in lectures]
+    header += ["present", "absent"]
+
+    cells = (
+        Attendance.objects.filter(course=course)
+        .order_by("student_id", "lecture_number")
+        .values_list("student_id", "lecture_number", "status")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    def rows():
+        for student, marks in _join(_course_students(course), cells):
+            statuses = list(marks.values())
+            yield [
+                *student,
+                *(marks.get(n, "") for n in lectures),
+                statuses.count("present"),
+                statuses.count("absent"),
+            ]
+
+    return csv_response(f"course-{course.id}-attendance.csv", header, rows())
+
+
+def gradebook_csv(course):
+    exams = list(Exam.objects.filter(course=course).order_by("date", "id").values_list("id", "title", "max_score"))
+    max_scores = {exam_id: max_score for exam_id, _, max_score in exams}
+
+    header = ["student_id", "username", "first_name", "last_name"]
+    header += [f"{title} (/{max_score})" for _, title, max_score in exams]
+    header += ["weighted_average"]
+
+    cells = (
+        Grade.objects.filter(exam__course=course)
+        .order_by("student_id")
+        .values_list("student_id", "exam_id", "score")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    def rows():
+        for student, scores in _join(_course_students(course), cells):
+            # same weighting as the analytics: scores over the max_scores of
+            # the exams the student sat
+            possible = sum(max_scores[exam_id] for exam_id in scores)
+            average = round(sum(scores.values()) / possible * 100, 2) if possible else ""
+            yield [
+                *student,
+                *(scores.get(exam_id, "") for exam_id, _, _ in exams),
+                average,
+            ]
+
+    return csv_response(f"course-{course.id}-gradebook.csv", header, rows())
@@ -0,0 +1,446 @@
+import base64
+import datetime
+import hashlib
+import json
+import random
+import time
+
+from django.core.cache import cache
+from django.db.models import F, OuterRef, Subquery, Window
+from django.db.models.functions import RowNumber
+
+from .models import Post, PostImage, Course, JobPost, User
+
+# Materialized home feed.
+#
+# Every content type keeps a pool of its newest IDs per city in the cache.
+# The pools are rebuilt lazily (one windowed query per content type). A new or
+# deleted row drops them (signals.py) rather than editing them in place,
+# which concurrent writers would race on; the next read rebuilds them.
+# Feed buckets, i.e. the candidate lists for one (city, user_type, keywords)
+# combination, are composed from those pools and cached until the next write
+# to one of the content types bumps its version.
+#
+# Anonymous visitors get random items. Instead of ORDER BY RANDOM() over the
+# whole table, a pool of the most recent IDs per content type is sampled in
+# O(k) and the picks are fetched with one id__in query.
+#
+# Pages are addressed by an opaque cursor holding a per-session seed and an
+# offset into each stream (posts, courses, jobs). The seed fixes the order of
+# every stream and the way they are interleaved, and the session's shuffled
+# streams are cached under it, so later writes (new versions, a changed sample
+# pool) don't reshuffle a session mid-scroll. Each page only fetches its own rows.
+#
+# The rows of a page are hydrated with one query per content type (publisher
+# users joined, the first post image as a subquery annotation) into plain
+# dicts ready for FeedItemSerializer.
+
+FEED_KINDS = ("post", "course", "job")
+FEED_POOL_SIZE = 60
+FEED_SAMPLE_POOL_SIZE = 1000
+FEED_TTL = 60 * 30
+FEED_SESSION_TTL = 60 * 30  # since the session's last page
+FEED_ANONYMOUS_PICKS = 10
+
+CITIES = [city for city, _ in User.CITY_CHOICES]
+
+# how many items of each stream a bucket holds, per user type
+FEED_WEIGHTS = {
+    "student": {
+        "post_city": 5, "post_global": 3,
+        "course_kw": 10, "course_city": 8,
+        "job_global": 2,
+    },
+    "lecturer": {
+        "post_city": 4, "post_global": 3,
+        "course_global": 4,
+        "job_kw": 10, "job_city": 6,
+    },
+    "institution": {
+        "post_city": 12, "post_global": 6,
+        "course_city": 4,
+        "job_global": 3,
+    },
+}
+
+
+def _pool_key(kind, city):
+    return f"feed:pool:{kind}:{city}"
+
+
+def _sample_key(kind):
+    return f"feed:sample:{kind}"
+
+
+def _version_key(kind):
+    return f"feed:version:{kind}"
+
+
+def _city_field(kind):
+    return "user__city" if kind == "post" else "institution__user__city"
+
+
+def _model(kind):
+    return {"post": Post, "course": Course, "job": JobPost}[kind]
+
+
+def keyword_signature(keywords):
+    if not keywords:
+        return "-"
+    joined = ",".join(sorted(set(keywords)))
+    return hashlib.md5(joined.encode("utf-8")).hexdigest()[:16]
+
+
+# -------------------------
+# POOLS
+# -------------------------
+
+def rebuild_pools(kind):
+    """Rebuild the per-city pools of one content type with a single query."""
+    rows = (
+        _model(kind).objects
+        .annotate(
+            city=F(_city_field(kind)),
+            rank=Window(RowNumber(), partition_by=F(_city_field(kind)), order_by=F("id").desc()),
+        )
+        .filter(rank__lte=FEED_POOL_SIZE)
+        .values_list("city", "id")
+    )
+
+    pools = {city: [] for city in CITIES}
+    for city, item_id in rows:
+        pools.setdefault(city, []).append(item_id)
+
+    for ids in pools.values():
+        ids.sort(reverse=True)
+
+    cache.set_many({_pool_key(kind, city): ids for city, ids in pools.items()}, FEED_TTL)
+    return pools
+
+
+def get_pools(kind):
+    keys = {_pool_key(kind, city): city for city in CITIES}
+    cached = cache.get_many(keys.keys())
+
+    if len(cached) < len(keys):
+        return rebuild_pools(kind)
+
+    return {keys[key]: ids for key, ids in cached.items()}
+
+
+def get_versions():
+    keys = [_version_key(kind) for kind in FEED_KINDS]
+    cached = cache.get_many(keys)
+    return [cached.get(key, 0) for key in keys]
+
+
+def bump_version(kind):
+    # time based, so an evicted key can never come back as an old version
+    cache.set(_version_key(kind), time.time_ns(), None)
+
+
+def invalidate_pools(kind):
+    """Drop the city and sample pools of a content type after a row was added or deleted."""
+    keys = [_pool_key(kind, city) for city in CITIES] + [_sample_key(kind)]
+    cache.delete_many(keys)
+    bump_version(kind)
+
+
+def refresh_all():
+    for kind in FEED_KINDS:
+        rebuild_pools(kind)
+        rebuild_sample_pool(kind)
+        bump_version(kind)
+
+
+# -------------------------
+# RANDOM SAMPLING
+# -------------------------
+
+def rebuild_sample_pool(kind):
+    ids = list(_model(kind).objects.order_by("-id").values_list("id", flat=True)[:FEED_SAMPLE_POOL_SIZE])
+    cache.set(_sample_key(kind), ids, FEED_TTL)
+    return ids
+
+
+def get_sample_pool(kind):
+    ids = cache.get(_sample_key(kind))
+    if ids is None:
+        ids = rebuild_sample_pool(kind)
+    return ids
+
+
+def sample_ids(kind, k, rng=random):
+    """Pick up to k random recent IDs of a content type without touching the table."""
+    pool = get_sample_pool(kind)
+    return rng.sample(pool, min(k, len(pool)))
+
+
+# -------------------------
+# BUCKETS
+# -------------------------
+
+def _city_stream(pools, city, limit):
+    return pools.get(city, [])[:limit]
+
+
+def _global_stream(pools, city, limit):
+    ids = []
+    for pool_city, pool in pools.items():
+        if pool_city != city:
+            ids.extend(pool)
+    ids.sort(reverse=True)
+    return ids[:limit]
+
+
+def _keyword_stream(kind, keywords, limit):
+    # keyword matches aren't bound to a city, so they are cached per signature
+    key = f"feed:kw:{kind}:{keyword_signature(keywords)}:{get_versions()[FEED_KINDS.index(kind)]}"
+    ids = cache.get(key)
+
+    if ids is None:
+        # keywords are normalized tokens, matched against the GIN indexed
+        # search_tokens of the items
+        ids = list(
+            _model(kind).objects.filter(search_tokens__overlap=list(keywords))
+            .order_by("-id").values_list("id", flat=True)[:FEED_POOL_SIZE]
+        )
+        cache.set(key, ids, FEED_TTL)
+
+    return ids[:limit]
+
+
+def build_bucket(city, user_type, keywords):
+    weights = FEED_WEIGHTS[user_type]
+    bucket = {}
+
+    for kind in FEED_KINDS:
+        pools = None
+        ids = []
+
+        for stream in ("kw", "city", "global"):
+            limit = weights.get(f"{kind}_{stream}")
+            if not limit:
+                continue
+
+            if stream == "kw":
+                if keywords:
+                    ids += _keyword_stream(kind, keywords, limit)
+                continue
+
+            if pools is None:
+                pools = get_pools(kind)
+
+            if stream == "city":
+                ids += _city_stream(pools, city, limit)
+            else:
+                ids += _global_stream(pools, city, limit)
+
+        # a keyword match can also be a city pick
+        bucket[kind] = list(dict.fromkeys(ids))
+
+    return bucket
+
+
+def get_feed_bucket(city, user_type, keywords):
+    """Candidate IDs per content type for a (city, user_type, keywords) bucket."""
+    if user_type not in FEED_WEIGHTS:
+        return {kind: [] for kind in FEED_KINDS}
+
+    versions = ":".join(str(v) for v in get_versions())
+    key = f"feed:bucket:{city}:{user_type}:{keyword_signature(keywords)}:{versions}"
+
+    bucket = cache.get(key)
+    if bucket is None:
+        bucket = build_bucket(city, user_type, keywords)
+        cache.set(key, bucket, FEED_TTL)
+
+    return bucket
+
+
+# -------------------------
+# CURSOR PAGINATION
+# -------------------------
+
+class InvalidCursor(Exception):
+    pass
+
+
+def new_seed():
+    return random.getrandbits(32)
+
+
+def encode_cursor(seed, offsets):
+    raw = json.dumps({"s": seed, "o": offsets}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        seed = int(data["s"])
+        offsets = [int(x) for x in data["o"]]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor()
+
+    if len(offsets) != len(FEED_KINDS) or any(x < 0 for x in offsets):
+        raise InvalidCursor()
+
+    return seed, offsets
+
+
+def session_streams(seed, user_type=None, city=None, keywords=None):
+    """The ordered ID streams of one feed session, the same on every page of it."""
+    key = f"feed:session:{user_type or '-'}:{city or '-'}:{keyword_signature(keywords)}:{seed}"
+
+    streams = cache.get(key)
+    if streams is not None:
+        cache.touch(key, FEED_SESSION_TTL)
+        return streams
+
+    streams = _build_session_streams(seed, user_type, city, keywords)
+    cache.set(key, streams, FEED_SESSION_TTL)
+    return streams
+
+
+def _build_session_streams(seed, user_type, city, keywords):
+    if user_type is None:
+        # anonymous: a seeded sample, so every page of the session sees the same one
+        rng = random.Random(seed)
+        streams = {kind: sample_ids(kind, FEED_ANONYMOUS_PICKS, rng) for kind in FEED_KINDS}
+    else:
+        streams = get_feed_bucket(city, user_type, keywords)
+
+    shuffled = {}
+    for kind in FEED_KINDS:
+        ids = list(streams[kind])
+        random.Random(f"{seed}:{kind}").shuffle(ids)
+        shuffled[kind] = ids
+
+    return shuffled
+
+
+def plan_page(streams, seed, offsets, page_size):
+    """
+    Interleave the streams starting at offsets. Returns the (kind, id) picks
+    of the page and the offsets the next page starts from.
+    """
+    offsets = list(offsets)
+    rng = random.Random(f"{seed}:{':'.join(str(x) for x in offsets)}")
+    picks = []
+
+    while len(picks) < page_size:
+        remaining = [len(streams[kind]) - offsets[i] for i, kind in enumerate(FEED_KINDS)]
+        total = sum(x for x in remaining if x > 0)
+        if total == 0:
+            break
+
+        # weighted by what's left, so the streams run out at about the same time
+        roll = rng.randrange(total)
+        for i, kind in enumerate(FEED_KINDS):
+            if remaining[i] <= 0:
+                continue
+            if roll < remaining[i]:
+                picks.append((kind, streams[kind][offsets[i]]))
+                offsets[i] += 1
+                break
+            roll -= remaining[i]
+
+    return picks, offsets
+
+
+def has_more(streams, offsets):
+    return any(len(streams[kind]) > offsets[i] for i, kind in enumerate(FEED_KINDS))
+
+
+# -------------------------
+# HYDRATION
+# -------------------------
+
+def _image_url(field_file):
+    return field_file.url if field_file else None
+
+
+def _post_items(ids):
+    first_image = PostImage.objects.filter(post=OuterRef("pk")).order_by("id").values("image")[:1]
+    storage = PostImage._meta.get_field("image").storage
+
+    posts = (
+        Post.objects.filter(id__in=ids)
+        .select_related("user")
+        .annotate(first_image=Subquery(first_image))
+    )
+
+    for p in posts:
+        yield {
+            "type": "post",
+            "id": p.id,
+            "title": p.title,
+            "description": p.description,
+            "image": storage.url(p.first_image) if p.first_image else None,
+            "created_at": p.created_at,
+
+            "publisher_id": p.user.id,
+            "publisher_username": p.user.username,
+            "publisher_profile_image": _image_url(p.user.profile_image),
+        }
+
+
+def _course_items(ids):
+    courses = Course.objects.filter(id__in=ids).select_related("institution__user")
+
+    for c in courses:
+        publisher = c.institution.user
+        yield {
+            "type": "course",
+            "id": c.id,
+            "title": c.title,
+            "description": c.about,
+            "image": _image_url(c.course_image),
+            "created_at": datetime.datetime.combine(c.starting_date, datetime.time.min),
+
+            "publisher_id": publisher.id,
+            "publisher_username": publisher.username,
+            "publisher_profile_image": _image_url(publisher.profile_image),
+        }
+
+
+def _job_items(ids):
+    jobs = JobPost.objects.filter(id__in=ids).select_related("institution__user")
+
+    for j in jobs:
+        publisher = j.institution.user
+        yield {
+            "type": "job",
+            "id": j.id,
+            "title": j.title,
+            "description": j.description,
+            "image": None,
+            "created_at": j.created_at,
+
+            "publisher_id": publisher.id,
+            "publisher_username": publisher.username,
+            "publisher_profile_image": _image_url(publisher.profile_image),
+        }
+
+
+HYDRATORS = {"post": _post_items, "course": _course_items, "job": _job_items}
+
+
+def hydrate(picks):
+    """
+    Turn (kind, id) picks into feed item dicts, in pick order, with at most
+    one query per content type. Picks whose row is gone are dropped.
+    """
+    ids = {kind: [] for kind in FEED_KINDS}
+    for kind, item_id in picks:
+        ids[kind].append(item_id)
+
+    items = {}
+    for kind, kind_ids in ids.items():
+        if kind_ids:
+            for item in HYDRATORS[kind](kind_ids):
+                items[(kind, item["id"])] = item
+
+    return [items[pick] for pick in picks if pick in items]
@@ -0,0 +1,97 @@
+import numpy as np
+from django.db import transaction
+
+from . import analytics, outbox
+from .models import Grade, Student
+
+# Bulk grading.
+#
+# A submission for a whole exam is handled as a set: every username is
+# resolved with one query, the scores are validated in one vectorized pass
+# and all accepted rows are written with a single INSERT ... ON CONFLICT
+# (exam, student) DO UPDATE. Each submitted row gets an accept/reject
+# result, in the order it was submitted.
+
+REJECT_INVALID_SCORE = "invalid_score"
+REJECT_NOT_ENROLLED = "not_enrolled"
+REJECT_DUPLICATE = "duplicate"  # a later valid row for the same student wins
+
+
+def grade_exam(exam, rows):
+    """
+    Upsert the {"username", "score"} rows as grades of exam. Returns the
+    per-row results and the (student, score) pairs that were written.
+    """
+    usernames = [row["username"] for row in rows]
+    scores = np.fromiter((row["score"] for row in rows), dtype=np.float64, count=len(rows))
+
+    valid_score = np.isfinite(scores) & (scores >= 0) & (scores <= exam.max_score)
+
+    students = {
+        student.user.username: student
+        for student in Student.objects.filter(
+            courses=exam.course, user__username__in=set(usernames)
+        ).select_related("user")
+    }
+    enrolled = np.fromiter((username in students for username in usernames), dtype=bool, count=len(rows))
+
+    # of the valid rows for a student, the last one wins
+    candidates = valid_score & enrolled
+    last_index = {usernames[i]: i for i in np.flatnonzero(candidates)}
+    is_last = np.zeros(len(rows), dtype=bool)
+    is_last[list(last_index.values())] = True
+
+    accepted = candidates & is_last
+
+    results = []
+    graded = []
+    for i, username in enumerate(usernames):
+        # NaN/inf pass the serializer but can't be rendered back as JSON
+        score = float(scores[i]) if np.isfinite(scores[i]) else None
+        reason = None
+
+        if not valid_score[i]:
+            reason = REJECT_INVALID_SCORE
+        elif not enrolled[i]:
+            reason = REJECT_NOT_ENROLLED
+        elif not is_last[i]:
+            reason = REJECT_DUPLICATE
+        else:
+            graded.append((students[username], score))
+
+        results.append({"username": username, "score": score, "accepted": bool(accepted[i]), "reason": reason})
+
+    if graded:
+        with transaction.atomic():
+            Grade.objects.bulk_create(
+                [Grade(exam=exam, student=student, score=score) for student, score in graded],
+                update_conflicts=True,
+                unique_fields=["exam", "student"],
+                update_fields=["score"],
+            )
+            transaction.on_commit(lambda: analytics.bump_version(exam.course_id))
+
+    return results, graded
+
+
+def grade_emails(exam, graded):
+    """Unsaved outbox emails telling students (and responsibles) their score."""
+    course = exam.course
+    emails = []
+
+    for student, score in graded:
+        user = student.user
+        subject = f"Grade for {exam.title} - {course.title}"
+        msg = (
+            f"Dear {user.first_name},\n\n"
+            f"Your score for exam '{exam.title}' in course '{course.title}' is {score}/{exam.max_score}.\n\n"
+            f"Best regards."
+        )
+
+        recipients = [user.email]
+        if student.responsible_email:
+            recipients.append(student.responsible_email)
+
+        emails.append(outbox.build(subject, msg, recipients))
+
+    return emails
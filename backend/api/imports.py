@@ -0,0 +1,246 @@
+import csv
+import io
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import attendance, grading, outbox
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+# Spreadsheet imports of grades and attendance.
+#
+# Uploaded CSV/XLSX files are read row by row (csv over a text wrapper,
+# openpyxl in read_only mode) and fed to the same bulk paths as the JSON
+# endpoints, IMPORT_CHUNK_SIZE rows at a time, so memory stays flat however
+# long the roster is. A first pass reads the whole file without applying
+# anything, so an unreadable file is rejected before any chunk is saved.
+# Every rejected row is reported with its line number.
+#
+# Small files are imported within the request. Larger ones are stored as an
+# ImportJob that the run_imports command picks up; the job's counters are
+# saved after every chunk so clients can poll its progress.
+
+IMPORT_CHUNK_SIZE = 500
+IMPORT_INLINE_MAX_BYTES = 256 * 1024
+IMPORT_MAX_BYTES = 20 * 1024 * 1024
+IMPORT_MAX_ERRORS = 1000  # reported per import, the counters keep counting
+IMPORT_EXTENSIONS = (".csv", ".xlsx")
+
+GRADE_COLUMNS = ("username", "score")
+ATTENDANCE_COLUMNS = ("username", "status")
+
+
+class InvalidImport(Exception):
+    pass
+
+
+# -------------------------
+# READING
+# -------------------------
+
+def _csv_rows(file):
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text, strict=True)
+    try:
+        yield from reader
+    except UnicodeDecodeError:
+        raise InvalidImport("CSV files must be UTF-8 encoded.")
+    except csv.Error as e:
+        raise InvalidImport(f"The CSV file is malformed at line {reader.line_num}: {e}.")
+    finally:
+        # leave the underlying file to its owner
+        text.detach()
+
+
+def _xlsx_rows(file):
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+    from zipfile import BadZipFile
+
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except (InvalidFileException, BadZipFile, KeyError):
+        raise InvalidImport("The file is not a valid XLSX workbook.")
+
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_rows(file, file_name, columns):
+    """
+    Yield (line_number, {column: value}) for every non-empty row of a CSV or
+    XLSX file whose header row names the given columns (in any order, case
+    insensitive). Other columns are ignored.
+    """
+    reader = _xlsx_rows(file) if file_name.lower().endswith(".xlsx") else _csv_rows(file)
+
+    header = next(reader, None)
+    if header is None:
+        raise InvalidImport("The file is empty.")
+
+    names = [str(name).strip().lower() if name is not None else "" for name in header]
+    missing = [column for column in columns if column not in names]
+    if missing:
+        raise InvalidImport(f"Missing column(s): {', '.join(missing)}.")
+
+    index = {column: names.index(column) for column in columns}
+
+    for line_number, row in enumerate(reader, start=2):
+        if not row or all(value in (None, "") for value in row):
+            continue
+        yield line_number, {column: row[i] if i < len(row) else None for column, i in index.items()}
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def parse_grade(values):
+    username = _text(values["username"])
+    if not username:
+        return None, "missing_username"
+
+    try:
+        score = float(values["score"])
+    except (TypeError, ValueError):
+        return None, grading.REJECT_INVALID_SCORE
+
+    return {"username": username, "score": score}, None
+
+
+def parse_attendance(values):
+    username = _text(values["username"])
+    if not username:
+        return None, "missing_username"
+
+    status = _text(values["status"]).lower()
+    if status not in ("present", "absent"):
+        return None, "invalid_status"
+
+    return {"username": username, "status": status}, None
+
+
+# -------------------------
+# IMPORTING
+# -------------------------
+
+def check_file(file, file_name, columns):
+    """
+    Read the whole file once without applying anything, so a decoding or
+    format error further down can't leave the rows before it imported.
+    """
+    for _ in read_rows(file, file_name, columns):
+        pass
+    file.seek(0)
+
+
+def _import(rows, parse, apply, progress=None):
+    summary = {"total_rows": 0, "accepted": 0, "rejected": 0, "errors": []}
+
+    def reject(line_number, username, reason):
+        summary["rejected"] += 1
+        if len(summary["errors"]) < IMPORT_MAX_ERRORS:
+            summary["errors"].append({"row": line_number, "username": username, "reason": reason})
+
+    def flush(chunk, line_numbers):
+        for line_number, result in zip(line_numbers, apply(chunk)):
+            if result["accepted"]:
+                summary["accepted"] += 1
+            else:
+                reject(line_number, result["username"], result["reason"])
+        if progress:
+            progress(summary)
+
+    chunk, line_numbers = [], []
+    for line_number, values in rows:
+        summary["total_rows"] += 1
+
+        item, reason = parse(values)
+        if reason:
+            reject(line_number, _text(values.get("username")), reason)
+            continue
+
+        chunk.append(item)
+        line_numbers.append(line_number)
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            flush(chunk, line_numbers)
+            chunk, line_numbers = [], []
+
+    if chunk:
+        flush(chunk, line_numbers)
+
+    return summary
+
+
+def import_grades(exam, file, file_name, progress=None):
+    # a student repeated within a chunk keeps its last valid row, across
+    # chunks the later chunk simply overwrites
+    def apply(chunk):
+        with transaction.atomic():
+            results, graded = grading.grade_exam(exam, chunk)
+            outbox.enqueue_many(grading.grade_emails(exam, graded))
+        return results
+
+    check_file(file, file_name, GRADE_COLUMNS)
+    return _import(read_rows(file, file_name, GRADE_COLUMNS), parse_grade, apply, progress)
+
+
+def import_attendance(course, lecture_number, file, file_name, progress=None):
+    def apply(chunk):
+        with transaction.atomic():
+            results, newly_absent = attendance.mark_lecture(course, lecture_number, chunk)
+            outbox.enqueue_many(attendance.absence_emails(course, lecture_number, newly_absent))
+        return results
+
+    check_file(file, file_name, ATTENDANCE_COLUMNS)
+    return _import(read_rows(file, file_name, ATTENDANCE_COLUMNS), parse_attendance, apply, progress)
+
+
+# -------------------------
+# BACKGROUND JOBS
+# -------------------------
+
+def claim_job():
+    """Mark the oldest pending job as running and return it, or None."""
+    with transaction.atomic():
+        job = ImportJob.objects.select_for_update(skip_locked=True).filter(status="pending").order_by("id").first()
+        if job is not None:
+            job.status = "running"
+            job.started_at = timezone.now()
+            job.save(update_fields=["status", "started_at"])
+    return job
+
+
+def run_job(job):
+    def progress(summary):
+        job.total_rows = summary["total_rows"]
+        job.accepted = summary["accepted"]
+        job.rejected = summary["rejected"]
+        job.errors = summary["errors"]
+        job.save(update_fields=["total_rows", "accepted", "rejected", "errors"])
+
+    try:
+        with job.file.open("rb") as file:
+            if job.kind == "grades":
+                summary = import_grades(job.exam, file, job.file.name, progress)
+            else:
+                summary = import_attendance(job.course, job.lecture_number, file, job.file.name, progress)
+    except InvalidImport as e:
+        job.status = "failed"
+        job.message = str(e)
+    except Exception:
+        logger.exception("Import job %s failed", job.id)
+        job.status = "failed"
+        job.message = "The import stopped unexpectedly, rows before the failure were saved."
+    else:
+        progress(summary)
+        job.status = "done"
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "message", "finished_at"])
+    return job
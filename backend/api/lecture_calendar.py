@@ -0,0 +1,78 @@
+import datetime
+
+# Lecture calendar of a course.
+#
+# A course meets on a fixed set of weekdays between starting_date and
+# ending_date (both included), so its lectures repeat with a period of one
+# week. Counting them is arithmetic: full weeks times the number of
+# weekdays, plus the weekdays that fall in the remaining partial week.
+# Lecture n is found the same way, (n - 1) // len(days) weeks after the
+# start plus the offset of its weekday, without walking the days between.
+
+DAY_NUMBERS = {
+    "monday": 0,
+    "tuesday": 1,
+    "wednesday": 2,
+    "thursday": 3,
+    "friday": 4,
+    "saturday": 5,
+    "sunday": 6,
+}
+
+
+def _offsets(start_date, days_list):
+    """Days from start_date to each lecture of its first week, ascending."""
+    return sorted({(DAY_NUMBERS[day] - start_date.weekday()) % 7 for day in days_list})
+
+
+def count_lectures(start_date, end_date, days_list):
+    if end_date < start_date:
+        return 0
+
+    weeks, rest = divmod((end_date - start_date).days + 1, 7)
+    offsets = _offsets(start_date, days_list)
+
+    return weeks * len(offsets) + sum(1 for offset in offsets if offset < rest)
+
+
+def lecture_dates(start_date, end_date, days_list):
+    """Yield the date of every lecture, in order, lazily."""
+    offsets = _offsets(start_date, days_list)
+    if not offsets:
+        return
+
+    week_start = start_date
+    while True:
+        for offset in offsets:
+            date = week_start + datetime.timedelta(days=offset)
+            if date > end_date:
+                return
+            yield date
+        week_start += datetime.timedelta(weeks=1)
+
+
+def lecture_date(course, lecture_number):
+    """Date of lecture_number (1 based) of course, or None if it has no such lecture."""
+    offsets = _offsets(course.starting_date, course.days)
+    if not offsets or lecture_number < 1:
+        return None
+
+    weeks, index = divmod(lecture_number - 1, len(offsets))
+    date = course.starting_date + datetime.timedelta(weeks=weeks, days=offsets[index])
+
+    return date if date <= course.ending_date else None
+
+
+def lecture_number(course, date):
+    """Number of the lecture course holds on date, or None if it holds none."""
+    if not course.starting_date <= date <= course.ending_date:
+        return None
+    if date.weekday() not in {DAY_NUMBERS[day] for day in course.days}:
+        return None
+
+    return count_lectures(course.starting_date, date, course.days)
+
+
+def course_lectures(course):
+    """Yield (lecture_number, date) for every lecture of course."""
+    return enumerate(lecture_dates(course.starting_date, course.ending_date, course.days), start=1)
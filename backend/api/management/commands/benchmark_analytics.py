@@ -0,0 +1,71 @@
+import statistics
+import time
+from collections import defaultdict
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from api import analytics
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the grade analytics of one course (per-exam distributions and "
+        "weighted student averages) with NumPy against a plain Python version, "
+        "on synthetic grade rows. The database isn't touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 1_000_000])
+        parser.add_argument("--exams", type=int, default=20)
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        exams = options["exams"]
+
+        self.stdout.write(f"{'rows':>10} | {'numpy ms':>10} | {'python ms':>10}")
+        self.stdout.write("-" * 36)
+
+        for size in options["sizes"]:
+            # every student sits every exam, exams are out of 50 or 100
+            exam_ids = np.arange(size) % exams
+            student_ids = np.arange(size) // exams
+            max_scores = np.where(exam_ids % 2, 50.0, 100.0)
+            scores = np.round(rng.uniform(0, 1, size) * max_scores, 1)
+
+            rows = list(zip(exam_ids.tolist(), student_ids.tolist(), scores.tolist(), max_scores.tolist()))
+
+            numpy_ms = self.measure(
+                options["runs"], lambda: analytics.course_report(exam_ids, student_ids, scores, max_scores)
+            )
+            python_ms = self.measure(options["runs"], lambda: self.python_report(rows))
+
+            self.stdout.write(f"{size:>10} | {numpy_ms:>10.2f} | {python_ms:>10.2f}")
+
+    def python_report(self, rows):
+        by_exam = defaultdict(list)
+        earned = defaultdict(float)
+        possible = defaultdict(float)
+
+        for exam_id, student_id, score, max_score in rows:
+            by_exam[exam_id].append(score / max_score * 100)
+            earned[student_id] += score
+            possible[student_id] += max_score
+
+        for percents in by_exam.values():
+            statistics.mean(percents)
+            statistics.median(percents)
+            statistics.pstdev(percents)
+            statistics.quantiles(percents, n=20)
+
+        return {student_id: earned[student_id] / possible[student_id] * 100 for student_id in earned}
+
+    def measure(self, runs, fn):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,115 @@
+import io
+import multiprocessing
+import resource
+import statistics
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from ai_util.decode import fit, open_image
+
+
+def _full_decode(data):
+    # what classify_document did before: decode and convert every pixel,
+    # then let the model's transforms shrink it
+    return fit(Image.open(io.BytesIO(data)).convert("RGB"))
+
+
+def _bounded_decode(data):
+    return open_image(io.BytesIO(data))
+
+
+METHODS = {"full": _full_decode, "bounded": _bounded_decode}
+
+
+def _memory_kb(field):
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+
+
+def _peak_kb():
+    try:
+        return _memory_kb("VmHWM")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure(method, data, runs, results):
+    # Runs in a fresh process so the peak is this method's own. ru_maxrss
+    # survives exec (a spawned child starts at its parent's peak), so on
+    # Linux the peak window is reset and read from /proc instead.
+    fn = METHODS[method]
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        before = _memory_kb("VmRSS")
+    except OSError:
+        before = _peak_kb()
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(data)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    results.put((statistics.median(timings), (_peak_kb() - before) / 1024))
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare decoding large uploads in full (the old classify_document path) with the "
+        "bounded decode of ai_util/decode.py (JPEG draft / reduce straight to 224x224), on "
+        "synthetic phone-sized photos. Each method runs in its own process to report its "
+        "peak RSS growth next to the median latency. No model is loaded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", default=["4000x3000", "6000x4000"], help="WIDTHxHEIGHT")
+        parser.add_argument("--formats", nargs="+", default=["JPEG", "PNG"])
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        context = multiprocessing.get_context("spawn")
+
+        self.stdout.write(
+            f"{'input':>16} | {'MB file':>8} | {'full ms':>8} | {'bounded ms':>10} | "
+            f"{'full peak MB':>12} | {'bounded peak MB':>15}"
+        )
+        self.stdout.write("-" * 86)
+
+        for size in options["sizes"]:
+            width, height = map(int, size.lower().split("x"))
+            img = self.photo(rng, width, height)
+
+            for fmt in options["formats"]:
+                buffer = io.BytesIO()
+                img.save(buffer, fmt, **({"quality": 90} if fmt == "JPEG" else {"compress_level": 1}))
+                data = buffer.getvalue()
+
+                measured = {}
+                for method in METHODS:
+                    results = context.Queue()
+                    process = context.Process(target=_measure, args=(method, data, options["runs"], results))
+                    process.start()
+                    measured[method] = results.get()
+                    process.join()
+
+                self.stdout.write(
+                    f"{size + ' ' + fmt:>16} | {len(data) / 1e6:>8.1f} | "
+                    f"{measured['full'][0]:>8.1f} | {measured['bounded'][0]:>10.1f} | "
+                    f"{measured['full'][1]:>12.1f} | {measured['bounded'][1]:>15.1f}"
+                )
+
+    def photo(self, rng, width, height):
+        # smooth gradients plus sensor-like noise, so it compresses like a photo
+        x = np.linspace(0, 1, width, dtype=np.float32)[None, :, None]
+        y = np.linspace(0, 1, height, dtype=np.float32)[:, None, None]
+        pixels = (np.sin(x * 25 + y * 9 + np.arange(3, dtype=np.float32)) * 0.5 + 0.5) * 200
+        pixels += rng.normal(0, 8, (height, width, 3)).astype(np.float32)
+        return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
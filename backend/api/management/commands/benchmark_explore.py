@@ -0,0 +1,107 @@
+import datetime
+import statistics
+import time
+import tracemalloc
+
+from django.contrib.postgres.search import SearchVector
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api import search
+from api.models import User, Course
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare sorting explore matches by city in Python against the Case/When "
+        "ordering key with a LIMIT, for a query matching every course. Reports the "
+        "median latency and the peak Python memory of fetching one page. Everything "
+        "runs inside a transaction that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        runs = options["runs"]
+        page_size = options["page_size"]
+        batch_size = options["batch_size"]
+
+        try:
+            with transaction.atomic():
+                lecturer_user = User.objects.create(
+                    username="benchmark_explore_lecturer",
+                    email="benchmark_explore_lecturer@example.com",
+                    user_type="lecturer",
+                )
+                institutions = [
+                    User.objects.create(
+                        username=f"benchmark_explore_{city}",
+                        email=f"benchmark_explore_{city}@example.com",
+                        user_type="institution",
+                        city=city,
+                    ).institution
+                    for city in ("baghdad", "basra")
+                ]
+
+                # signals don't fire for bulk_create, the vectors are set in one UPDATE below
+                for start in range(0, rows, batch_size):
+                    Course.objects.bulk_create(
+                        Course(
+                            title=f"Python course {i}",
+                            about="",
+                            starting_date=datetime.date(2025, 1, 1),
+                            ending_date=datetime.date(2025, 6, 1),
+                            institution=institutions[i % 2],
+                            lecturer=lecturer_user.lecturer,
+                        )
+                        for i in range(start, min(start + batch_size, rows))
+                    )
+                Course.objects.update(search_vector=SearchVector("title", config=search.SEARCH_CONFIG))
+
+                city = "basra"
+                query = search.build_query("python")
+
+                def python_sorted():
+                    matches = Course.objects.filter(search_vector=query).select_related("institution__user")
+                    ordered = sorted(matches, key=lambda x: 0 if x.institution.user.city == city else 1)
+                    return ordered[:page_size]
+
+                def database_ordered():
+                    queryset = Course.objects.select_related("institution__user")
+                    return list(search.search(queryset, "python", city)[:page_size])
+
+                self.stdout.write(f"{rows} matching rows, page of {page_size}, median of {runs} runs, one traced run")
+                self.stdout.write(f"{'strategy':>18} | {'ms':>10} | {'peak KiB':>10}")
+                self.stdout.write("-" * 44)
+
+                for label, fn in (("python sort", python_sorted), ("case/when + limit", database_ordered)):
+                    ms, peak = self.measure(runs, fn)
+                    self.stdout.write(f"{label:>18} | {ms:>10.2f} | {peak / 1024:>10.0f}")
+
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def measure(self, runs, fn):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        # traced separately, tracemalloc slows allocations down a lot
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        return statistics.median(timings), peak
@@ -0,0 +1,64 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api import search
+from api.models import Student, Lecturer, Institution, Course, JobPost
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the five LIMITed queries of a grouped explore response run one after the "
+        "other on one connection (what ExploreView does) against running them in five "
+        "threads with a fresh connection each. Read only, runs against the existing rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--q", default="", help="Search query, empty lists everything.")
+        parser.add_argument("--city", default="baghdad")
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument("--runs", type=int, default=20)
+
+    def handle(self, *args, **options):
+        q, city, limit = options["q"], options["city"], options["limit"]
+
+        querysets = [
+            Student.objects.select_related("user"),
+            Lecturer.objects.select_related("user"),
+            Institution.objects.select_related("user"),
+            Course.objects.select_related("institution__user").defer("institution__search_vector"),
+            JobPost.objects.select_related("institution__user").defer("institution__search_vector"),
+        ]
+
+        def fetch(queryset):
+            return list(search.search(queryset, q, city)[:limit + 1])
+
+        def sequential():
+            return [fetch(queryset) for queryset in querysets]
+
+        def fetch_on_new_connection(queryset):
+            try:
+                return fetch(queryset)
+            finally:
+                connection.close()
+
+        def threaded():
+            with ThreadPoolExecutor(max_workers=len(querysets)) as executor:
+                return list(executor.map(fetch_on_new_connection, querysets))
+
+        sequential()  # opens the request connection, as a web worker already has one
+
+        self.stdout.write(f"q={q!r}, city={city}, limit={limit}, median of {options['runs']} runs")
+        self.stdout.write(f"{'strategy':>28} | {'ms':>8}")
+        self.stdout.write("-" * 39)
+
+        for label, fn in (("sequential, one connection", sequential), ("5 threads, new connections", threaded)):
+            timings = []
+            for _ in range(options["runs"]):
+                start = time.perf_counter()
+                fn()
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(f"{label:>28} | {statistics.median(timings):>8.2f}")
@@ -0,0 +1,97 @@
+import datetime
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api import feed
+from api.models import User, Post, Course, JobPost
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ORDER BY RANDOM() against the sampled-ID pool for the anonymous feed "
+        "as the Post/Course/JobPost tables grow. Everything runs inside a transaction "
+        "that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+        parser.add_argument("--runs", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        sizes = sorted(options["sizes"])
+        runs = options["runs"]
+        batch_size = options["batch_size"]
+
+        self.stdout.write(f"{'rows':>10} | {'kind':>6} | {'order_by(?) ms':>15} | {'sampled ms':>11}")
+        self.stdout.write("-" * 52)
+
+        try:
+            with transaction.atomic():
+                institution_user = User.objects.create(
+                    username="benchmark_feed_institution",
+                    email="benchmark_feed_institution@example.com",
+                    user_type="institution",
+                )
+                lecturer_user = User.objects.create(
+                    username="benchmark_feed_lecturer",
+                    email="benchmark_feed_lecturer@example.com",
+                    user_type="lecturer",
+                )
+                institution = institution_user.institution
+                lecturer = lecturer_user.lecturer
+
+                makers = {
+                    "post": lambda i: Post(user=institution_user, title=f"Post {i}"),
+                    "course": lambda i: Course(
+                        title=f"Course {i}",
+                        about="",
+                        starting_date=datetime.date(2025, 1, 1),
+                        ending_date=datetime.date(2025, 6, 1),
+                        institution=institution,
+                        lecturer=lecturer,
+                    ),
+                    "job": lambda i: JobPost(institution=institution, title=f"Job {i}", specialty=""),
+                }
+                models = {"post": Post, "course": Course, "job": JobPost}
+
+                current = 0
+                for size in sizes:
+                    # signals don't fire for bulk_create, so the pools are rebuilt explicitly
+                    for kind, make in makers.items():
+                        for start in range(current, size, batch_size):
+                            stop = min(start + batch_size, size)
+                            models[kind].objects.bulk_create(make(i) for i in range(start, stop))
+                    current = size
+
+                    for kind, model in models.items():
+                        feed.rebuild_sample_pool(kind)
+
+                        random_ms = self.measure(runs, lambda: list(model.objects.order_by("?")[:10]))
+                        sampled_ms = self.measure(
+                            runs,
+                            lambda: list(model.objects.filter(id__in=feed.sample_ids(kind, 10))),
+                        )
+
+                        self.stdout.write(f"{size:>10} | {kind:>6} | {random_ms:>15.2f} | {sampled_ms:>11.2f}")
+
+                raise Rollback()
+        except Rollback:
+            pass
+
+        feed.refresh_all()
+
+    def measure(self, runs, fn):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,105 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api import attendance
+from api.models import Course, CourseAttendanceRollup, CourseStudentStats
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the attendance counters (CourseStudentStats per course/student and "
+        "CourseAttendanceRollup per course) from the Attendance table. With --verify "
+        "nothing is written; mismatches are reported and the command fails if any."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verify", action="store_true", help="Only compare, don't rebuild.")
+
+    def handle(self, *args, **options):
+        if options["verify"]:
+            self.verify(self.expected())
+            return
+
+        with transaction.atomic():
+            # the counters are only written under the course lock, see api/attendance.py;
+            # counting after taking it, so no lecture marked meanwhile is lost
+            list(Course.objects.select_for_update().order_by("id").values_list("id", flat=True))
+            expected = self.expected()
+
+            CourseStudentStats.objects.all().delete()
+            CourseStudentStats.objects.bulk_create(
+                [
+                    CourseStudentStats(
+                        course_id=course_id,
+                        student_id=student_id,
+                        present=present,
+                        absent=absent,
+                        last_lecture=last_lecture,
+                        percentage=pct,
+                    )
+                    for (course_id, student_id), (present, absent, last_lecture, pct) in expected.items()
+                ],
+                batch_size=2000,
+            )
+
+            CourseAttendanceRollup.objects.all().delete()
+            rollups = {}
+            for (course_id, _), (present, absent, _, _) in expected.items():
+                rollup = rollups.setdefault(course_id, CourseAttendanceRollup(course_id=course_id))
+                rollup.present += present
+                rollup.absent += absent
+            CourseAttendanceRollup.objects.bulk_create(rollups.values(), batch_size=2000)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(expected)} student counters across {len(rollups)} courses."
+        ))
+
+    def expected(self):
+        expected = {}
+        for row in attendance.student_totals().iterator(chunk_size=2000):
+            expected[(row["course_id"], row["student_id"])] = (
+                row["present"],
+                row["absent"],
+                row["last_lecture"],
+                attendance.percentage(row["present"], row["total_lectures"]),
+            )
+        return expected
+
+    def verify(self, expected):
+        mismatches = 0
+
+        actual = {
+            (stats.course_id, stats.student_id): stats
+            for stats in CourseStudentStats.objects.iterator(chunk_size=2000)
+        }
+
+        for key in expected.keys() | actual.keys():
+            want = expected.get(key)
+            stats = actual.get(key)
+            got = (stats.present, stats.absent, stats.last_lecture, stats.percentage) if stats else None
+
+            # rows with nothing counted are as good as no row
+            if want is None and got is not None and got[:2] == (0, 0):
+                continue
+            if want is None or got is None or want[:3] != got[:3] or abs(want[3] - got[3]) > 1e-6:
+                mismatches += 1
+                self.stdout.write(f"course {key[0]}, student {key[1]}: expected {want}, found {got}")
+
+        rollups = {rollup.course_id: (rollup.present, rollup.absent) for rollup in CourseAttendanceRollup.objects.all()}
+        course_totals = {}
+        for (course_id, _), (present, absent, _, _) in expected.items():
+            totals = course_totals.setdefault(course_id, [0, 0])
+            totals[0] += present
+            totals[1] += absent
+
+        for course_id in course_totals.keys() | rollups.keys():
+            want = tuple(course_totals.get(course_id, (0, 0)))
+            got = rollups.get(course_id, (0, 0))
+            if want != got:
+                mismatches += 1
+                self.stdout.write(f"course {course_id} rollup: expected {want}, found {got}")
+
+        if mismatches:
+            raise CommandError(f"{mismatches} attendance counters are out of date, run without --verify to rebuild.")
+
+        self.stdout.write(self.style.SUCCESS(f"All {len(expected)} student counters match."))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from api import search
+from api.models import Student, Lecturer, Institution, Course, JobPost
+
+
+class Command(BaseCommand):
+    help = "Recompute the full-text search vectors and normalized search tokens of every searchable row."
+
+    def handle(self, *args, **options):
+        querysets = [
+            Student.objects.select_related("user"),
+            Lecturer.objects.select_related("user"),
+            Institution.objects.select_related("user"),
+            Course.objects.all(),
+            JobPost.objects.all(),
+        ]
+
+        for qs in querysets:
+            count = 0
+            batch = []
+            has_tokens = qs.model._meta.model_name in search.TOKEN_SOURCES
+
+            for instance in qs.iterator(chunk_size=1000):
+                search.update_search_vector(instance)
+                count += 1
+
+                if has_tokens:
+                    instance.search_tokens = search.search_tokens(instance)
+                    batch.append(instance)
+                if len(batch) >= 1000:
+                    qs.model.objects.bulk_update(batch, ["search_tokens"])
+                    batch = []
+
+            if batch:
+                qs.model.objects.bulk_update(batch, ["search_tokens"])
+            self.stdout.write(f"{qs.model.__name__}: {count} rows indexed.")
+
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
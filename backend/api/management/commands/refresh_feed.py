@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api import feed
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized home feed pools for every content type and city."
+
+    def handle(self, *args, **options):
+        feed.refresh_all()
+        self.stdout.write(self.style.SUCCESS("Feed pools rebuilt."))
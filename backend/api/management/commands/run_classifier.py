@@ -0,0 +1,51 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_util import worker
+from ai_util.client import ClassifierUnavailable, classifier_metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Load the document classifier once and serve the web processes over the Unix "
+        "socket CLASSIFIER_SOCKET, so they never import torch themselves. Concurrent "
+        "requests are grouped into batches of up to --max-batch-size images, waiting at "
+        "most --max-wait-ms for a batch to fill. This is what the classifier service runs. "
+        "Results are cached by image content and model version (--cache-size). With "
+        "--metrics it prints the running worker's queue, batch and cache metrics instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--socket", default=settings.CLASSIFIER_SOCKET, help="Defaults to CLASSIFIER_SOCKET.")
+        parser.add_argument("--max-batch-size", type=int, default=settings.CLASSIFIER_MAX_BATCH_SIZE)
+        parser.add_argument("--max-wait-ms", type=float, default=settings.CLASSIFIER_MAX_WAIT_MS)
+        parser.add_argument("--cache-size", type=int, default=settings.CLASSIFIER_CACHE_SIZE, help="Cached results, 0 disables the cache.")
+        parser.add_argument("--metrics", action="store_true", help="Print the running worker's metrics.")
+
+    def handle(self, *args, **options):
+        path = options["socket"]
+        if not path:
+            raise CommandError("Set CLASSIFIER_SOCKET or pass --socket.")
+
+        if options["metrics"]:
+            try:
+                self.stdout.write(json.dumps(classifier_metrics(path), indent=2))
+            except ClassifierUnavailable as e:
+                raise CommandError(str(e))
+            return
+
+        self.stdout.write(
+            f"Serving the document classifier on {path} "
+            f"(batches of up to {options['max_batch_size']}, {options['max_wait_ms']} ms wait)."
+        )
+        try:
+            worker.serve(
+                path,
+                max_batch_size=options["max_batch_size"],
+                max_wait_ms=options["max_wait_ms"],
+                cache_size=options["cache_size"],
+            )
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api import imports
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the pending spreadsheet imports (grades/attendance files too large to import "
+        "within the request). With --loop it keeps polling, which is how the importer "
+        "service runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new imports.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls when idle.")
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                job = imports.claim_job()
+
+                if job is not None:
+                    imports.run_job(job)
+                    self.stdout.write(
+                        f"Import {job.id} ({job.kind}) {job.status}: "
+                        f"{job.accepted} accepted, {job.rejected} rejected."
+                    )
+                    continue
+                if not options["loop"]:
+                    break
+
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
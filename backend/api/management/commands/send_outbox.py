@@ -0,0 +1,44 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from api import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Send the pending emails of the outbox over one SMTP connection. With --loop it "
+        "keeps polling, which is how the mailer service runs. For local testing point "
+        "EMAIL_HOST/EMAIL_PORT at an SMTP stand-in, e.g. `python -m aiosmtpd -n -l "
+        "localhost:8025` with EMAIL_PORT=8025 and EMAIL_USE_TLS=False."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=outbox.OUTBOX_BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new emails.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls when idle.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        connection = get_connection()
+
+        try:
+            while True:
+                sent, failed = outbox.send_due(connection, batch_size)
+                if sent or failed:
+                    self.stdout.write(f"{sent} sent, {failed} failed.")
+
+                # a full batch means there is probably more waiting
+                if sent + failed >= batch_size:
+                    continue
+                if not options["loop"]:
+                    break
+
+                # don't hold an idle SMTP session open between polls
+                connection.close()
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:43
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+BACKFILL_SQL = [
+    """
+    UPDATE api_course SET search_vector =
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(about, '')), 'B')
+    """,
+    """
+    UPDATE api_jobpost SET search_vector =
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(specialty, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(skills_required, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    """,
+    """
+    UPDATE api_institution i SET search_vector =
+        setweight(to_tsvector('simple', coalesce(i.title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(i.location, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(u.city, '')), 'C')
+    FROM api_user u WHERE u.id = i.user_id
+    """,
+    """
+    UPDATE api_lecturer l SET search_vector =
+        setweight(to_tsvector('simple', coalesce(u.first_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(u.last_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(l.specialty, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(l.skills, '')), 'B')
+    FROM api_user u WHERE u.id = l.user_id
+    """,
+    """
+    UPDATE api_student s SET search_vector =
+        setweight(to_tsvector('simple', coalesce(u.first_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(u.last_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(s.interesting_keywords, '')), 'B')
+    FROM api_user u WHERE u.id = s.user_id
+    """,
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_alter_attendance_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='institution',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='lecturer',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='course_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='institution',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='institution_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='jobpost_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lecturer',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='lecturer_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='student_search_idx'),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
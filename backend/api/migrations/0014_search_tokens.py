@@ -0,0 +1,155 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:47
+
+import re
+import unicodedata
+from functools import reduce
+from operator import add
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import TextField, Value
+
+
+# The text normalization of api/text.py and the documents of api/search.py as
+# they were when this migration was written, frozen here so later changes to
+# those modules don't change what the migration does.
+
+ARABIC_DIACRITICS = re.compile("[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06DC\u06DF-\u06E8\u06EA-\u06ED]")
+TATWEEL = "\u0640"
+
+ARABIC_FOLDING = str.maketrans({
+    "\u0622": "\u0627",  # alef with madda -> alef
+    "\u0623": "\u0627",  # alef with hamza above -> alef
+    "\u0625": "\u0627",  # alef with hamza below -> alef
+    "\u0671": "\u0627",  # alef wasla -> alef
+    "\u0624": "\u0648",  # waw with hamza -> waw
+    "\u0626": "\u064A",  # yaa with hamza -> yaa
+    "\u0649": "\u064A",  # alef maksura -> yaa
+    "\u0629": "\u0647",  # taa marbuta -> haa
+    "\u06CC": "\u064A",  # farsi yeh -> yaa
+    "\u06A9": "\u0643",  # keheh -> kaf
+    **{chr(0x0660 + d): str(d) for d in range(10)},
+    **{chr(0x06F0 + d): str(d) for d in range(10)},
+})
+
+ARABIC_DEFINITE_ARTICLE = "\u0627\u0644"
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 100
+
+DOCUMENTS = {
+    "student": lambda s: [(s.user.first_name, "A"), (s.user.last_name, "A"), (s.interesting_keywords, "B")],
+    "lecturer": lambda l: [(l.user.first_name, "A"), (l.user.last_name, "A"), (l.specialty, "B"), (l.skills, "B")],
+    "institution": lambda i: [(i.title, "A"), (i.location, "B"), (i.user.city, "C")],
+    "course": lambda c: [(c.title, "A"), (c.about, "B")],
+    "jobpost": lambda j: [(j.title, "A"), (j.specialty, "B"), (j.skills_required, "B"), (j.description, "C")],
+}
+
+TOKEN_SOURCES = {
+    "student": lambda s: [s.interesting_keywords],
+    "lecturer": lambda l: [l.skills],
+    "course": lambda c: [c.title],
+    "jobpost": lambda j: [j.title, j.description, j.skills_required],
+}
+
+
+def tokenize(text):
+    if not text:
+        return []
+
+    text = unicodedata.normalize("NFKC", text)
+    text = ARABIC_DIACRITICS.sub("", text).replace(TATWEEL, "")
+    text = " ".join(text.translate(ARABIC_FOLDING).casefold().split())
+
+    tokens = []
+    for word in TOKEN_PATTERN.findall(text):
+        if not MIN_TOKEN_LENGTH <= len(word) <= MAX_TOKEN_LENGTH:
+            continue
+        tokens.append(word)
+
+        if word.startswith(ARABIC_DEFINITE_ARTICLE) and len(word) > len(ARABIC_DEFINITE_ARTICLE) + MIN_TOKEN_LENGTH:
+            tokens.append(word[len(ARABIC_DEFINITE_ARTICLE):])
+
+    return list(dict.fromkeys(tokens))
+
+
+def search_vector(parts):
+    return reduce(add, (
+        SearchVector(Value(" ".join(tokenize(text)), output_field=TextField()), weight=weight, config="simple")
+        for text, weight in parts
+    ))
+
+
+def backfill(apps, schema_editor):
+    # normalized tokens for the new column, and the search vectors again since
+    # they are built from normalized text now
+    for model_name in ("student", "lecturer", "institution", "course", "jobpost"):
+        model = apps.get_model("api", model_name)
+        queryset = model.objects.all()
+        if model_name in ("student", "lecturer", "institution"):
+            queryset = queryset.select_related("user")
+
+        batch = []
+        for instance in queryset.iterator(chunk_size=1000):
+            vector = search_vector(DOCUMENTS[model_name](instance))
+            model.objects.filter(pk=instance.pk).update(search_vector=vector)
+
+            if model_name in TOKEN_SOURCES:
+                tokens = (token for text in TOKEN_SOURCES[model_name](instance) for token in tokenize(text))
+                instance.search_tokens = list(dict.fromkeys(tokens))
+                batch.append(instance)
+            if len(batch) >= 1000:
+                model.objects.bulk_update(batch, ["search_tokens"])
+                batch = []
+
+        if batch:
+            model.objects.bulk_update(batch, ["search_tokens"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='search_tokens',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=100), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='search_tokens',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=100), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='lecturer',
+            name='search_tokens',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=100), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='search_tokens',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=100), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_tokens'], name='course_tokens_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_tokens'], name='jobpost_tokens_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lecturer',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_tokens'], name='lecturer_tokens_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_tokens'], name='student_tokens_idx'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill(apps, schema_editor):
+    Attendance = apps.get_model("api", "Attendance")
+    CourseAttendanceRollup = apps.get_model("api", "CourseAttendanceRollup")
+
+    totals = Attendance.objects.values("course_id").annotate(
+        present=Count("id", filter=Q(status="present")),
+        absent=Count("id", filter=Q(status="absent")),
+    ).order_by()
+
+    CourseAttendanceRollup.objects.bulk_create(
+        [CourseAttendanceRollup(**row) for row in totals],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_email_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseAttendanceRollup',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='attendance_rollup', serialize=False, to='api.course')),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Max, Q
+
+
+def backfill(apps, schema_editor):
+    Attendance = apps.get_model("api", "Attendance")
+    CourseStudentStats = apps.get_model("api", "CourseStudentStats")
+
+    totals = Attendance.objects.values("course_id", "student_id").annotate(
+        present=Count("id", filter=Q(status="present")),
+        absent=Count("id", filter=Q(status="absent")),
+        last_lecture=Max("lecture_number"),
+        total_lectures=F("course__total_lectures"),
+    ).order_by()
+
+    CourseStudentStats.objects.bulk_create(
+        [
+            CourseStudentStats(
+                course_id=row["course_id"],
+                student_id=row["student_id"],
+                present=row["present"],
+                absent=row["absent"],
+                last_lecture=row["last_lecture"],
+                percentage=row["present"] / row["total_lectures"] * 100 if row["total_lectures"] else 0,
+            )
+            for row in totals.iterator(chunk_size=2000)
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_attendance_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStudentStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('last_lecture', models.PositiveIntegerField(blank=True, null=True)),
+                ('percentage', models.FloatField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_stats', to='api.course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_stats', to='api.student')),
+            ],
+            options={
+                'unique_together': {('course', 'student')},
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
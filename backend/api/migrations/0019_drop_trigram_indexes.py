@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:31
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_import_job'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='course',
+            name='course_title_trgm_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='institution',
+            name='institution_title_trgm_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='jobpost',
+            name='jobpost_title_trgm_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_first_name_trgm_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_last_name_trgm_idx',
+        ),
+    ]
@@ -3,6 +3,9 @@ from django.db import models
 from django.db.models import JSONField
 from django.core.validators import RegexValidator
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.utils import timezone
 from datetime import time
 from decimal import Decimal
 
@@ -82,6 +85,7 @@ class User(AbstractUser):
     otp_code = models.CharField(max_length=6, blank=True, null=True)
     otp_generated = models.DateTimeField(blank=True, null=True)
     REQUIRED_FIELDS=['first_name', 'last_name', 'email', 'city','user_type']
+
     def save(self, *args, **kwargs):
         if self.email:
             self.email = self.email.lower()
@@ -106,6 +110,12 @@ class Institution(models.Model):
         ('sunday', 'Sunday'),
     ]
     up_days = ArrayField(models.CharField(max_length=10, choices=DAYS), default=list)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="institution_search_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -118,6 +128,15 @@ class Lecturer(models.Model):
     skills = models.CharField(max_length=1000, blank=True, null=True)
     experience = models.PositiveIntegerField(blank=True, null=True)
     free_time = models.CharField(max_length=20, blank=True, null=True, validators=[timerange_validator])
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_tokens = ArrayField(models.CharField(max_length=100), default=list, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="lecturer_search_idx"),
+            GinIndex(fields=["search_tokens"], name="lecturer_tokens_idx"),
+        ]
+
     def __str__(self):
         return self.user.username
 
@@ -154,6 +173,14 @@ class Course(models.Model):
 
     capacity = models.PositiveIntegerField(default=0)  # 0 = unlimited
     total_lectures = models.PositiveIntegerField(default=0)  # number of sessions for this course
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_tokens = ArrayField(models.CharField(max_length=100), default=list, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="course_search_idx"),
+            GinIndex(fields=["search_tokens"], name="course_tokens_idx"),
+        ]
 
 class Student(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -172,6 +199,15 @@ class Student(models.Model):
     interesting_keywords = models.CharField(max_length=1000, blank=True, null=True, validators=[keywords_validator])
     responsible_phone = models.CharField(max_length=15, blank=True, null=True, validators=[phone_validator])
     responsible_email = models.EmailField(max_length=100, blank=True, null=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_tokens = ArrayField(models.CharField(max_length=100), default=list, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="student_search_idx"),
+            GinIndex(fields=["search_tokens"], name="student_tokens_idx"),
+        ]
+
     def __str__(self):
         return self.user.username
     
@@ -214,6 +250,14 @@ class JobPost(models.Model):
 
     salary_offer = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_tokens = ArrayField(models.CharField(max_length=100), default=list, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="jobpost_search_idx"),
+            GinIndex(fields=["search_tokens"], name="jobpost_tokens_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -245,6 +289,33 @@ class Attendance(models.Model):
     class Meta:
         unique_together = ("course", "student", "lecture_number")
 
+class CourseAttendanceRollup(models.Model):
+    # running totals of a course's attendance rows, kept current by
+    # api/attendance.py so dashboards don't have to count them
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name="attendance_rollup")
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.course.title} attendance"
+
+class CourseStudentStats(models.Model):
+    # attendance counters of one student in one course, kept current by
+    # api/attendance.py so progress bars are a single row lookup
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="student_stats")
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="course_stats")
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    last_lecture = models.PositiveIntegerField(null=True, blank=True)  # highest lecture_number marked
+    percentage = models.FloatField(default=0)  # present / course.total_lectures * 100
+
+    class Meta:
+        unique_together = ("course", "student")
+
+    def __str__(self):
+        return f"{self.student.user.username} in {self.course.title}"
+
 class Exam(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="exams")
     title = models.CharField(max_length=255)
@@ -289,3 +360,66 @@ class CoursePayment(models.Model):
         return f"{self.student.user.username} → {self.course.title}"
 
 
+
+# --- SPREADSHEET IMPORTS ---
+def upload_import_path(instance, file_name):
+    return f"{instance.created_by.username}/imports/{file_name}"
+
+class ImportJob(models.Model):
+    KIND_CHOICES = (
+        ('grades', 'Grades'),
+        ('attendance', 'Attendance'),
+    )
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="import_jobs")
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, null=True, blank=True)  # grades
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, null=True, blank=True)  # attendance
+    lecture_number = models.PositiveIntegerField(null=True, blank=True)  # attendance
+
+    file = models.FileField(upload_to=upload_import_path)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    total_rows = models.PositiveIntegerField(default=0)
+    accepted = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    errors = JSONField(default=list, blank=True)  # row level, capped
+    message = models.TextField(blank=True, default='')  # why the whole job failed
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} import #{self.id} ({self.status})"
+
+# --- EMAIL OUTBOX ---
+class EmailOutbox(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead'),  # gave up after too many failed attempts
+    )
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    recipients = ArrayField(models.EmailField(max_length=254))
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["next_attempt_at"], condition=models.Q(status='pending'), name="emailoutbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.recipients)} ({self.status})"
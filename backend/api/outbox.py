@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+# Transactional email outbox.
+#
+# Views never talk to SMTP. They write EmailOutbox rows, in the same
+# transaction as the data the emails are about, and the send_outbox command
+# drains the table in batches over one SMTP connection. Failed messages are
+# retried with exponential backoff and marked dead after OUTBOX_MAX_ATTEMPTS.
+#
+# Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several
+# senders can run side by side without sending anything twice.
+
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 6
+OUTBOX_BACKOFF_BASE = 30        # seconds before the first retry, doubled every attempt
+OUTBOX_BACKOFF_MAX = 60 * 60
+
+
+def build(subject, message, recipients):
+    """An unsaved outbox row, for enqueue_many."""
+    return EmailOutbox(subject=subject[:255], message=message, recipients=[r for r in recipients if r])
+
+
+def enqueue(subject, message, recipients):
+    email = build(subject, message, recipients)
+    email.save()
+    return email
+
+
+def enqueue_many(emails):
+    emails = [email for email in emails if email.recipients]
+    if emails:
+        EmailOutbox.objects.bulk_create(emails)
+    return len(emails)
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX))
+
+
+def _fail(email, error, now):
+    email.attempts += 1
+    email.last_error = f"{type(error).__name__}: {error}"
+    if email.attempts >= OUTBOX_MAX_ATTEMPTS:
+        email.status = "dead"
+    else:
+        email.next_attempt_at = now + backoff(email.attempts)
+
+
+def send_due(connection, batch_size=OUTBOX_BATCH_SIZE):
+    """
+    Send one batch of due emails over connection, which stays open for the
+    next batch. Returns (sent, failed).
+    """
+    sent = failed = 0
+
+    with transaction.atomic():
+        now = timezone.now()
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status="pending", next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+
+        for email in batch:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=email.recipients,
+                connection=connection,
+            )
+            try:
+                # reopens after a dropped connection, no-op while it's open
+                connection.open()
+                connection.send_messages([message])
+            except Exception as e:
+                connection.close()
+                _fail(email, e, now)
+                failed += 1
+            else:
+                email.status = "sent"
+                email.attempts += 1
+                email.sent_at = timezone.now()
+                email.last_error = ""
+                sent += 1
+
+        EmailOutbox.objects.bulk_update(
+            batch, ["status", "attempts", "next_attempt_at", "last_error", "sent_at"]
+        )
+
+    return sent, failed
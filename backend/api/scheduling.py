@@ -0,0 +1,163 @@
+import datetime
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import accumulate
+
+from .lecture_calendar import DAY_NUMBERS
+from .models import Course
+
+# Schedule conflicts.
+#
+# Two courses clash when they share a weekday, their time slots overlap and
+# their date ranges overlap on at least one such weekday. A ScheduleIndex
+# keeps, per weekday, the courses sorted by start_time together with the
+# running maximum of their end_times. A query bisects to the courses that
+# start before it ends and walks them backwards only while the running
+# maximum says one of them can still end after it starts, so a lookup costs
+# O(log n) plus the few courses that overlap in time.
+#
+# Indexes are built from one query; ScheduleIndex.group builds one per
+# lecturer (or any other key) from a single queryset for batch checks, which
+# is how free_lecturers answers for a whole staff list at once.
+
+
+def _dates_meet(day_number, start_a, end_a, start_b, end_b):
+    """Whether the two date ranges share at least one date on day_number."""
+    start, end = max(start_a, start_b), min(end_a, end_b)
+    if start > end:
+        return False
+    return (end - start).days >= 6 or (day_number - start.weekday()) % 7 <= (end - start).days
+
+
+class ScheduleIndex:
+    def __init__(self, courses):
+        by_day = defaultdict(list)
+        for course in courses:
+            for day in set(course.days):
+                by_day[day].append(course)
+
+        self._days = {}
+        for day, day_courses in by_day.items():
+            day_courses.sort(key=lambda c: c.start_time)
+            self._days[day] = (
+                [c.start_time for c in day_courses],
+                list(accumulate((c.end_time for c in day_courses), max)),
+                day_courses,
+            )
+
+    @classmethod
+    def group(cls, courses, key):
+        """{key(course): ScheduleIndex} of courses."""
+        groups = defaultdict(list)
+        for course in courses:
+            groups[key(course)].append(course)
+        return {k: cls(v) for k, v in groups.items()}
+
+    def conflict(self, days, start_time, end_time, starting_date=None, ending_date=None, exclude=None):
+        """
+        The first (course, day) clashing with the given slot, or None. A
+        missing date bound means the slot is open ended on that side.
+        exclude is a course id to ignore, e.g. the course being edited.
+        """
+        for day in days:
+            if day not in self._days:
+                continue
+            starts, max_ends, day_courses = self._days[day]
+
+            i = bisect_left(starts, end_time)  # courses starting before the slot ends
+            while i > 0 and max_ends[i - 1] > start_time:
+                i -= 1
+                course = day_courses[i]
+                if course.end_time <= start_time or course.id == exclude:
+                    continue
+                if _dates_meet(
+                    DAY_NUMBERS[day],
+                    course.starting_date, course.ending_date,
+                    starting_date or course.starting_date, ending_date or course.ending_date,
+                ):
+                    return course, day
+        return None
+
+
+def describe(course, day):
+    """The contradiction payload returned by the schedule check endpoints."""
+    return {
+        "course_id": course.id,
+        "course_title": course.title,
+        "institution": course.institution.title,
+        "institution_username": course.institution.user.username,
+        "day": day,
+        "time": f"{course.start_time.strftime('%H:%M')} - {course.end_time.strftime('%H:%M')}",
+    }
+
+
+def candidate_courses(queryset, days, starting_date=None, ending_date=None):
+    """
+    Narrow queryset to the courses that can clash at all (a shared weekday,
+    overlapping dates), with what describe() needs.
+    """
+    queryset = queryset.filter(days__overlap=list(days))
+    if starting_date:
+        queryset = queryset.filter(ending_date__gte=starting_date)
+    if ending_date:
+        queryset = queryset.filter(starting_date__lte=ending_date)
+    return queryset.select_related("institution__user")
+
+
+def find_conflict(queryset, days, start_time, end_time, starting_date=None, ending_date=None, exclude=None):
+    index = ScheduleIndex(candidate_courses(queryset, days, starting_date, ending_date))
+    found = index.conflict(days, start_time, end_time, starting_date, ending_date, exclude)
+    return describe(*found) if found else None
+
+
+def _parse_free_time(value):
+    """(start, end) times of a Lecturer.free_time ("HH:MM-HH:MM"), or None when unset/invalid."""
+    try:
+        start, end = (datetime.time.fromisoformat(part.strip()) for part in value.split("-"))
+    except (AttributeError, ValueError):
+        return None
+    return start, end
+
+
+def within_free_time(free_time, start_time, end_time):
+    """Whether the slot fits the lecturer's declared free_time (unset fits anything)."""
+    window = _parse_free_time(free_time)
+    if window is None:
+        return True
+
+    free_start, free_end = window
+    if free_start <= free_end:
+        return free_start <= start_time and end_time <= free_end
+    # window across midnight, e.g. 20:00-02:00
+    return start_time >= free_start or end_time <= free_end
+
+
+def free_lecturers(lecturers, days, start_time, end_time, starting_date=None, ending_date=None, use_free_time=True):
+    """
+    Split lecturers into (free, busy) for the slot. busy holds
+    (lecturer, contradiction) pairs; the contradiction is None for lecturers
+    whose free_time doesn't cover the slot. All courses of all lecturers are
+    read in one query.
+    """
+    lecturers = list(lecturers)
+    courses = candidate_courses(
+        Course.objects.filter(lecturer__in=[lecturer.id for lecturer in lecturers]),
+        days, starting_date, ending_date,
+    )
+    indexes = ScheduleIndex.group(courses, key=lambda course: course.lecturer_id)
+
+    free, busy = [], []
+    for lecturer in lecturers:
+        if use_free_time and not within_free_time(lecturer.free_time, start_time, end_time):
+            busy.append((lecturer, None))
+            continue
+
+        index = indexes.get(lecturer.id)
+        found = index.conflict(days, start_time, end_time, starting_date, ending_date) if index else None
+
+        if found:
+            busy.append((lecturer, describe(*found)))
+        else:
+            free.append(lecturer)
+
+    return free, busy
@@ -0,0 +1,268 @@
+import hashlib
+import re
+from functools import reduce
+from operator import add
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.core.cache import cache
+from django.db import OperationalError, connection, transaction
+from django.db.models import Case, F, IntegerField, TextField, Value, When
+
+from .models import Student, Lecturer, Institution, Course, JobPost
+from .text import normalize_text, tokenize, words
+
+# Full-text search over the explore entities.
+#
+# Every searchable model has a search_vector column (GIN indexed) holding the
+# weighted document below. The vectors are written from Python whenever a row
+# or its user changes (see signals.py), so the joined user fields don't need
+# database triggers. The "simple" configuration is used because the content
+# is a mix of Arabic and English and Postgres ships no Arabic stemmer.
+#
+# Documents and queries both go through the normalization in text.py first,
+# so spelling variants of Arabic words (hamza forms, taa marbuta, diacritics,
+# the definite article) meet on the same lexemes. The same tokens are kept in
+# a search_tokens array on the rows the feed matches keywords against, which
+# turns keyword matching into GIN-indexed array overlap.
+#
+# Typeahead suggestions don't go through the full search. Their normalized
+# words are matched as prefixes of the weight A lexemes only (names and
+# titles) on the same GIN indexed vectors, ordered by prefix and pg_trgm
+# similarity, run under a statement timeout and cached per prefix for a
+# short while.
+
+SEARCH_CONFIG = "simple"
+
+# (text, weight) parts of each model's document, by model name so the
+# migrations can use them with historical models
+DOCUMENTS = {
+    "student": lambda s: [
+        (s.user.first_name, "A"),
+        (s.user.last_name, "A"),
+        (s.interesting_keywords, "B"),
+    ],
+    "lecturer": lambda l: [
+        (l.user.first_name, "A"),
+        (l.user.last_name, "A"),
+        (l.specialty, "B"),
+        (l.skills, "B"),
+    ],
+    "institution": lambda i: [
+        (i.title, "A"),
+        (i.location, "B"),
+        (i.user.city, "C"),
+    ],
+    "course": lambda c: [
+        (c.title, "A"),
+        (c.about, "B"),
+    ],
+    "jobpost": lambda j: [
+        (j.title, "A"),
+        (j.specialty, "B"),
+        (j.skills_required, "B"),
+        (j.description, "C"),
+    ],
+}
+
+# text the search_tokens of each model are made of
+TOKEN_SOURCES = {
+    "student": lambda s: [s.interesting_keywords],
+    "lecturer": lambda l: [l.skills],
+    "course": lambda c: [c.title],
+    "jobpost": lambda j: [j.title, j.description, j.skills_required],
+}
+
+# where the city of each model's rows lives, for boosting
+CITY_FIELDS = {
+    Student: "user__city",
+    Lecturer: "user__city",
+    Institution: "user__city",
+    Course: "institution__user__city",
+    JobPost: "institution__user__city",
+}
+
+# index columns the result serializers never read
+UNSELECTED_FIELDS = ("search_vector", "search_tokens")
+
+WEBSEARCH_OPERATORS = re.compile(r'"|(^|\s)-\w|\sor\s', re.IGNORECASE)
+
+
+def search_vector(parts):
+    return reduce(add, (
+        SearchVector(Value(" ".join(tokenize(text)), output_field=TextField()), weight=weight, config=SEARCH_CONFIG)
+        for text, weight in parts
+    ))
+
+
+def update_search_vector(instance):
+    model = type(instance)
+    vector = search_vector(DOCUMENTS[model._meta.model_name](instance))
+    model._default_manager.filter(pk=instance.pk).update(search_vector=vector)
+
+
+def search_tokens(instance):
+    parts = TOKEN_SOURCES[instance._meta.model_name](instance)
+    return list(dict.fromkeys(token for text in parts for token in tokenize(text)))
+
+
+def build_query(q):
+    """
+    Queries using websearch syntax (quotes, -exclusion, or) are passed to
+    websearch_to_tsquery. Plain queries match every word as a prefix, so
+    results show up while a word is still being typed.
+    """
+    if WEBSEARCH_OPERATORS.search(q):
+        return SearchQuery(normalize_text(q), search_type="websearch", config=SEARCH_CONFIG)
+
+    terms = words(q)
+    if not terms:
+        return None
+
+    # letters and digits only, so nothing here can break the tsquery syntax
+    raw = " & ".join(f"{term}:*" for term in terms)
+    return SearchQuery(raw, search_type="raw", config=SEARCH_CONFIG)
+
+
+def city_priority(model, city):
+    """1 for rows of model located in city, 0 otherwise, as an ordering key."""
+    return Case(
+        When(**{CITY_FIELDS[model]: city}, then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def search(queryset, q, city=None):
+    """
+    Rank matches of q in queryset, rows from the given city first. An empty
+    q lists everything, newest first. Ranking and city boosting are ORDER BY
+    keys, so a slice of the result is a LIMIT and only that page is loaded.
+    """
+    model = queryset.model
+    query = build_query(q) if q else None
+
+    field_names = {field.name for field in model._meta.concrete_fields}
+    queryset = queryset.defer(*(name for name in UNSELECTED_FIELDS if name in field_names))
+
+    if query is not None:
+        queryset = queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F("search_vector"), query)
+        )
+    elif q:
+        return queryset.none()
+    else:
+        queryset = queryset.annotate(rank=Value(0.0))
+
+    ordering = ["-rank", "-id"]
+
+    if city:
+        queryset = queryset.annotate(city_boost=city_priority(model, city))
+        ordering.insert(0, "-city_boost")
+
+    return queryset.order_by(*ordering)
+
+
+# -------------------------
+# SUGGESTIONS
+# -------------------------
+
+SUGGEST_MIN_LENGTH = 2
+SUGGEST_LIMIT = 5
+SUGGEST_TIMEOUT_MS = 200
+SUGGEST_TTL = 60
+
+
+def _title_query(terms):
+    """Every term as a prefix of a weight A (name/title) lexeme of the search_vector."""
+    raw = " & ".join(f"{term}:*A" for term in terms)
+    return SearchQuery(raw, search_type="raw", config=SEARCH_CONFIG)
+
+
+def _people(model, terms, limit):
+    rows = (
+        model.objects.filter(search_vector=_title_query(terms))
+        .annotate(
+            prefix=Case(When(user__first_name__istartswith=terms[0], then=Value(1)), default=Value(0)),
+            similarity=TrigramSimilarity("user__first_name", terms[0]),
+        )
+        .order_by("-prefix", "-similarity", "-id")
+        .values("id", "user__username", "user__first_name", "user__last_name")[:limit]
+    )
+    return [
+        {
+            "id": row["id"],
+            "username": row["user__username"],
+            "label": f"{row['user__first_name']} {row['user__last_name']}",
+        }
+        for row in rows
+    ]
+
+
+def _titles(queryset, terms, limit, username_field=None):
+    q = " ".join(terms)
+    fields = ["id", "title"] + ([username_field] if username_field else [])
+    rows = (
+        queryset.filter(search_vector=_title_query(terms))
+        .annotate(
+            prefix=Case(When(title__istartswith=q, then=Value(1)), default=Value(0)),
+            similarity=TrigramSimilarity("title", q),
+        )
+        .order_by("-prefix", "-similarity", "-id")
+        .values(*fields)[:limit]
+    )
+    return [
+        {
+            "id": row["id"],
+            "label": row["title"],
+            **({"username": row[username_field]} if username_field else {}),
+        }
+        for row in rows
+    ]
+
+
+def suggest(q, limit=SUGGEST_LIMIT):
+    """
+    Top name/title suggestions per type for a typeahead prefix. A type whose
+    query runs past the statement timeout comes back empty instead of
+    holding up the others.
+    """
+    # normalized like the documents, so spelling variants meet
+    terms = words(q)
+    q = " ".join(terms)
+    if len(q) < SUGGEST_MIN_LENGTH:
+        return {name: [] for name in ("students", "lecturers", "institutions", "courses", "jobs")}
+
+    key = f"explore:suggest:{limit}:{hashlib.md5(q.encode('utf-8')).hexdigest()}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    fetchers = {
+        "students": lambda: _people(Student, terms, limit),
+        "lecturers": lambda: _people(Lecturer, terms, limit),
+        "institutions": lambda: _titles(Institution.objects.all(), terms, limit, "user__username"),
+        "courses": lambda: _titles(Course.objects.all(), terms, limit),
+        "jobs": lambda: _titles(JobPost.objects.all(), terms, limit),
+    }
+
+    results = {}
+    timed_out = False
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f"SET LOCAL statement_timeout = {int(SUGGEST_TIMEOUT_MS)}")
+
+        for name, fetch in fetchers.items():
+            try:
+                # savepoint, so a cancelled statement doesn't poison the rest
+                with transaction.atomic():
+                    results[name] = fetch()
+            except OperationalError:
+                results[name] = []
+                timed_out = True
+
+    # don't pin partial results in the cache
+    if not timed_out:
+        cache.set(key, results, SUGGEST_TTL)
+
+    return results
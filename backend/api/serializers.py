@@ -1,8 +1,10 @@
 from rest_framework import serializers
 from .models import *
+from .imports import IMPORT_EXTENSIONS, IMPORT_MAX_BYTES
+from .lecture_calendar import count_lectures
+from . import scheduling
 from django.utils import timezone
 from datetime import timedelta
-import datetime
 
 class FeedItemSerializer(serializers.Serializer):
     type = serializers.CharField()
@@ -228,28 +230,6 @@ class PostCreateSerializer(serializers.ModelSerializer):
 
         return post
 
-def count_lectures(start_date, end_date, days_list):
-    day_map = {
-        "monday": 0,
-        "tuesday": 1,
-        "wednesday": 2,
-        "thursday": 3,
-        "friday": 4,
-        "saturday": 5,
-        "sunday": 6,
-    }
-
-    target_days = [day_map[d] for d in days_list]
-    count = 0
-
-    cur = start_date
-    while cur <= end_date:
-        if cur.weekday() in target_days:
-            count += 1
-        cur += datetime.timedelta(days=1)
-
-    return count
-
 class CourseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Course
@@ -299,6 +279,22 @@ class CourseSerializer(serializers.ModelSerializer):
                 "end_time": "End time must be greater than start time."
             })
 
+        lecturer = data.get("lecturer") or getattr(self.instance, "lecturer", None)
+        days = data.get("days") or getattr(self.instance, "days", None)
+
+        if lecturer and days and st and et and start and end:
+            conflict = scheduling.find_conflict(
+                lecturer.courses.all(), days, st, et, start, end,
+                exclude=getattr(self.instance, "id", None),
+            )
+            if conflict:
+                raise serializers.ValidationError({
+                    "lecturer": (
+                        f"The lecturer teaches '{conflict['course_title']}' on {conflict['day']} "
+                        f"at {conflict['time']} in the same period."
+                    )
+                })
+
         return data
 
     def create(self, validated_data):
@@ -890,9 +886,37 @@ class AttendanceRecordSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=["present", "absent"])
 
 class AttendanceCreateSerializer(serializers.Serializer):
-    lecture_number = serializers.IntegerField()
+    # either the lecture_number or the date the lecture was held on
+    lecture_number = serializers.IntegerField(required=False)
+    date = serializers.DateField(required=False)
     records = AttendanceRecordSerializer(many=True)
 
+    def validate(self, data):
+        if "lecture_number" not in data and "date" not in data:
+            raise serializers.ValidationError({"lecture_number": "Provide the lecture_number or the date."})
+        return data
+
+class ImportUploadSerializer(serializers.Serializer):
+    file = serializers.FileField()
+
+    def validate_file(self, value):
+        if not value.name.lower().endswith(IMPORT_EXTENSIONS):
+            raise serializers.ValidationError("Upload a .csv or .xlsx file.")
+        if value.size > IMPORT_MAX_BYTES:
+            raise serializers.ValidationError(f"The file is larger than {IMPORT_MAX_BYTES // (1024 * 1024)} MB.")
+        return value
+
+class AttendanceImportSerializer(ImportUploadSerializer):
+    lecture_number = serializers.IntegerField()
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJob
+        fields = [
+            "id", "kind", "status", "total_rows", "accepted", "rejected",
+            "errors", "message", "created_at", "started_at", "finished_at",
+        ]
+
 class StudentGradeSerializer(serializers.ModelSerializer):
     score = serializers.FloatField()
     exam_title = serializers.CharField(source="exam.title")
@@ -903,6 +927,33 @@ class StudentGradeSerializer(serializers.ModelSerializer):
         model = Grade
         fields = ["exam_title", "exam_date", "score", "max_score"]
 
+class ScheduleSlotSerializer(serializers.Serializer):
+    days = serializers.ListField(child=serializers.CharField(), allow_empty=False)
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    starting_date = serializers.DateField(required=False)
+    ending_date = serializers.DateField(required=False)
+
+    def validate_days(self, value):
+        # course days are stored lowercase, accept "Monday" as well
+        days = [day.strip().lower() for day in value]
+        valid = {key for key, _ in Course.DAYS}
+        invalid = [day for day in days if day not in valid]
+        if invalid:
+            raise serializers.ValidationError(f"Invalid day(s): {', '.join(invalid)}.")
+        return days
+
+    def validate(self, data):
+        if data["end_time"] <= data["start_time"]:
+            raise serializers.ValidationError({"end_time": "End time must be greater than start time."})
+        if "starting_date" in data and "ending_date" in data and data["ending_date"] < data["starting_date"]:
+            raise serializers.ValidationError({"ending_date": "Ending date cannot be before starting date."})
+        return data
+
+class FreeLecturersSerializer(ScheduleSlotSerializer):
+    # lecturers whose declared free_time doesn't cover the slot count as busy
+    use_free_time = serializers.BooleanField(default=True)
+
 class WeeklyScheduleItemSerializer(serializers.Serializer):
     course_id = serializers.IntegerField()
     course_title = serializers.CharField()
@@ -1,6 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models import QuerySet
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
-from .models import User, Institution, Lecturer, Student
+from django.db import transaction
+from .models import User, Institution, Lecturer, Student, Post, Course, JobPost, Attendance, Exam, Grade
+from . import analytics, attendance, feed, search
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -11,3 +14,117 @@ def create_user_profile(sender, instance, created, **kwargs):
             Lecturer.objects.create(user=instance)
         elif instance.user_type == 'student':
             Student.objects.create(user=instance)
+
+FEED_SENDERS = {Post: "post", Course: "course", JobPost: "job"}
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=JobPost)
+def refresh_feed_on_save(sender, instance, created, **kwargs):
+    kind = FEED_SENDERS[sender]
+    if created:
+        # after commit, so a rebuild can't miss the new row
+        transaction.on_commit(lambda: feed.invalidate_pools(kind))
+    else:
+        # an edit doesn't change what's newest, only the buckets' content
+        feed.bump_version(kind)
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=JobPost)
+def refresh_feed_on_delete(sender, instance, **kwargs):
+    kind = FEED_SENDERS[sender]
+    transaction.on_commit(lambda: feed.invalidate_pools(kind))
+
+@receiver(pre_save, sender=Student)
+@receiver(pre_save, sender=Lecturer)
+@receiver(pre_save, sender=Course)
+@receiver(pre_save, sender=JobPost)
+def refresh_search_tokens(sender, instance, **kwargs):
+    instance.search_tokens = search.search_tokens(instance)
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Lecturer)
+@receiver(post_save, sender=Institution)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=JobPost)
+def refresh_search_vector(sender, instance, **kwargs):
+    search.update_search_vector(instance)
+
+# the user fields that are part of the profile documents
+PROFILE_SEARCH_FIELDS = ("first_name", "last_name", "city")
+
+def _profile_search_values(user):
+    # __dict__, so a deferred field is never loaded just for this
+    return tuple(user.__dict__.get(field) for field in PROFILE_SEARCH_FIELDS)
+
+@receiver(post_init, sender=User)
+def remember_profile_search_values(sender, instance, **kwargs):
+    instance._profile_search_values = _profile_search_values(instance)
+
+@receiver(post_save, sender=User)
+def refresh_profile_search_vector(sender, instance, created, update_fields=None, **kwargs):
+    # most user saves (OTPs, verification, images) don't touch the documents
+    values = _profile_search_values(instance)
+    if created or values == instance._profile_search_values:
+        return
+    if update_fields is not None and not set(update_fields) & set(PROFILE_SEARCH_FIELDS):
+        return
+
+    instance._profile_search_values = values
+    profile = getattr(instance, instance.user_type, None)
+    if profile is not None:
+        search.update_search_vector(profile)
+
+def _origin_model(origin):
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+@receiver(post_delete, sender=Attendance)
+def refresh_attendance_counters(sender, instance, origin=None, **kwargs):
+    # deletes (admin) don't go through api/attendance.py. Rows cascaded from
+    # a course go with its rollup and stats, and a deleted student's rows are
+    # settled per course in discount_student_attendance, so only rows
+    # deleted as Attendance are counted here.
+    if origin is not None and _origin_model(origin) is not Attendance:
+        return
+    attendance.forget(instance)
+
+@receiver(pre_delete, sender=Student)
+def discount_student_attendance(sender, instance, **kwargs):
+    attendance.discount_student(instance)
+
+@receiver(post_save, sender=Course)
+def refresh_attendance_percentages(sender, instance, created, **kwargs):
+    # the stored percentages depend on total_lectures
+    if not created:
+        attendance.refresh_percentages(instance)
+
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+@receiver(post_save, sender=Exam)
+@receiver(post_delete, sender=Exam)
+def refresh_grade_analytics(sender, instance, origin=None, **kwargs):
+    # bulk grading bumps the version itself, see api/grading.py. Grades
+    # cascaded from an exam are covered by the exam's own post_delete, a
+    # deleted course takes its analytics with it, and a deleted student's
+    # courses are bumped once in refresh_student_grade_analytics.
+    if origin is not None and _origin_model(origin) is not sender:
+        return
+
+    if sender is Exam:
+        course_id = instance.course_id
+    else:
+        course_id = Exam.objects.filter(id=instance.exam_id).values_list("course_id", flat=True).first()
+
+    if course_id is not None:
+        transaction.on_commit(lambda: analytics.bump_version(course_id))
+
+@receiver(pre_delete, sender=Student)
+def refresh_student_grade_analytics(sender, instance, **kwargs):
+    course_ids = analytics.graded_courses(instance)
+
+    def bump():
+        for course_id in course_ids:
+            analytics.bump_version(course_id)
+
+    transaction.on_commit(bump)
@@ -1,3 +1,126 @@
-from django.test import TestCase
+import datetime
+import io
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import exports, feed, imports
+from .models import User, Post, PostImage, Course, JobPost, Exam, Grade, EmailOutbox
+from .views import HomeFeedView
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tests"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class HomeFeedQueryCountTests(TestCase):
+    ITEMS = 50
+
+    @classmethod
+    def setUpTestData(cls):
+        institution_user = User.objects.create(
+            username="inst", email="inst@example.com", first_name="In", last_name="St", user_type="institution",
+        )
+        lecturer_user = User.objects.create(
+            username="lect", email="lect@example.com", first_name="Le", last_name="Ct", user_type="lecturer",
+        )
+        institution = institution_user.institution
+        lecturer = lecturer_user.lecturer
+
+        for i in range(cls.ITEMS):
+            post = Post.objects.create(user=institution_user, title=f"post {i}")
+            PostImage.objects.create(post=post, image=f"posts/{i}.jpg")
+            Course.objects.create(
+                institution=institution, lecturer=lecturer, title=f"course {i}", about="about",
+                starting_date=datetime.date(2026, 1, 1), ending_date=datetime.date(2026, 3, 1),
+            )
+            JobPost.objects.create(institution=institution, title=f"job {i}", specialty="math")
+
+    def setUp(self):
+        cache.clear()
+        feed.refresh_all()  # the pools are warm in production
+        self.client = APIClient()
+
+    def feed_page(self, page_size):
+        with mock.patch.object(HomeFeedView, "page_size", page_size):
+            return self.client.get("/home/feed/")
+
+    @mock.patch.object(feed, "FEED_ANONYMOUS_PICKS", ITEMS)
+    def test_query_count_does_not_grow_with_page_size(self):
+        # both pages hold every content type, so one query per type each
+        for page_size in (101, 150):
+            with self.assertNumQueries(3):
+                response = self.feed_page(page_size)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data["results"]), page_size)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class GradeImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        institution_user = User.objects.create(
+            username="inst", email="inst@example.com", first_name="In", last_name="St", user_type="institution",
+        )
+        lecturer_user = User.objects.create(
+            username="lect", email="lect@example.com", first_name="Le", last_name="Ct", user_type="lecturer",
+        )
+        course = Course.objects.create(
+            institution=institution_user.institution, lecturer=lecturer_user.lecturer, title="course", about="about",
+            starting_date=datetime.date(2026, 1, 1), ending_date=datetime.date(2026, 3, 1),
+        )
+        cls.usernames = []
+        for i in range(3):
+            student_user = User.objects.create(
+                username=f"student{i}", email=f"student{i}@example.com", first_name="St", last_name=f"U{i}",
+                user_type="student",
+            )
+            student_user.student.courses.add(course)
+            cls.usernames.append(student_user.username)
+
+        cls.exam = Exam.objects.create(course=course, title="midterm", date=datetime.date(2026, 2, 1))
+
+    def grades_csv(self, rows, tail=b""):
+        # the note column pushes the tail past the text wrapper's first read
+        lines = [b"username,score,note"] + [
+            f"{self.usernames[i % 3]},{i % 100},{'x' * 40}".encode() for i in range(rows)
+        ]
+        return io.BytesIO(b"\n".join(lines) + b"\n" + tail)
+
+    def test_invalid_byte_after_first_chunk_imports_nothing(self):
+        rows = imports.IMPORT_CHUNK_SIZE + 10
+        file = self.grades_csv(rows, tail=b"student0,\xff\xfe\n")
+
+        with self.assertRaises(imports.InvalidImport):
+            imports.import_grades(self.exam, file, "grades.csv")
+
+        self.assertFalse(Grade.objects.exists())
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    def test_malformed_csv_is_an_invalid_import(self):
+        file = self.grades_csv(10, tail=b'student0,"12\n')
+
+        with self.assertRaises(imports.InvalidImport):
+            imports.import_grades(self.exam, file, "grades.csv")
+
+        self.assertFalse(Grade.objects.exists())
+
+    def test_valid_file_is_imported(self):
+        summary = imports.import_grades(self.exam, self.grades_csv(imports.IMPORT_CHUNK_SIZE + 10), "grades.csv")
+
+        # a student's last row per chunk is accepted, the later chunk overwrites
+        self.assertEqual(summary["accepted"], 6)
+        self.assertEqual(Grade.objects.filter(exam=self.exam).count(), 3)
+
+
+class CsvExportEscapingTests(SimpleTestCase):
+    def test_phone_numbers_stay_formulas_are_escaped(self):
+        lines = list(exports.stream_csv(
+            ["responsible_phone", "note", "score"],
+            [["+9647701234567", "=cmd|' /C calc'!A0", "-2.5"], ["07701234567", "@SUM(A1)", "-"]],
+        ))
+
+        self.assertEqual(lines[1], "+9647701234567,'=cmd|' /C calc'!A0,-2.5\r\n")
+        self.assertEqual(lines[2], "07701234567,'@SUM(A1),'-\r\n")
@@ -0,0 +1,71 @@
+import re
+import unicodedata
+
+# Text normalization shared by search and feed keyword matching.
+#
+# Arabic is written with a lot of optional variation: diacritics (harakat),
+# tatweel used for stretching, several alef/hamza forms, taa marbuta vs haa
+# and alef maksura vs yaa at the end of words. Users type whichever variant
+# their keyboard gives them, so both stored text and queries are folded to
+# one form before they're compared. Latin text is case folded.
+
+ARABIC_DIACRITICS = re.compile("[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06DC\u06DF-\u06E8\u06EA-\u06ED]")
+TATWEEL = "\u0640"
+
+ARABIC_FOLDING = str.maketrans({
+    "آ": "ا",  # alef with madda -> alef
+    "أ": "ا",  # alef with hamza above -> alef
+    "إ": "ا",  # alef with hamza below -> alef
+    "ٱ": "ا",  # alef wasla -> alef
+    "ؤ": "و",  # waw with hamza -> waw
+    "ئ": "ي",  # yaa with hamza -> yaa
+    "ى": "ي",  # alef maksura -> yaa
+    "ة": "ه",  # taa marbuta -> haa
+    "ی": "ي",  # farsi yeh -> yaa
+    "ک": "ك",  # keheh -> kaf
+    # Arabic-Indic and Persian digits -> ASCII digits
+    **{chr(0x0660 + d): str(d) for d in range(10)},
+    **{chr(0x06F0 + d): str(d) for d in range(10)},
+})
+
+ARABIC_DEFINITE_ARTICLE = "ال"  # "al"
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 100  # the max_length of the search_tokens items
+
+
+def normalize_text(text):
+    if not text:
+        return ""
+
+    # NFKC folds presentation forms and full-width Latin
+    text = unicodedata.normalize("NFKC", text)
+    text = ARABIC_DIACRITICS.sub("", text).replace(TATWEEL, "")
+    text = text.translate(ARABIC_FOLDING).casefold()
+    return " ".join(text.split())
+
+
+def words(text):
+    """Normalized words of text; underscores and punctuation separate words."""
+    return TOKEN_PATTERN.findall(normalize_text(text))
+
+
+def tokenize(text):
+    """
+    Normalized, de-duplicated tokens of text, in order of appearance. Arabic
+    words with the definite article also yield the bare word, so "البرمجة"
+    matches "برمجة". Longer "words" than MAX_TOKEN_LENGTH (pasted links,
+    hashes) are dropped.
+    """
+    tokens = []
+
+    for word in words(text):
+        if not MIN_TOKEN_LENGTH <= len(word) <= MAX_TOKEN_LENGTH:
+            continue
+        tokens.append(word)
+
+        if word.startswith(ARABIC_DEFINITE_ARTICLE) and len(word) > len(ARABIC_DEFINITE_ARTICLE) + MIN_TOKEN_LENGTH:
+            tokens.append(word[len(ARABIC_DEFINITE_ARTICLE):])
+
+    return list(dict.fromkeys(tokens))
@@ -8,6 +8,7 @@ urlpatterns = [
     path("notifications/", NotificationsView.as_view()),
     path("course/<int:course_id>/progress/", CourseProgressView.as_view()),
     path("explore/", ExploreSearchView.as_view()),
+    path("explore/suggest/", ExploreSuggestView.as_view()),
     path("course/<int:course_id>/", CourseDetailView.as_view()),
     path("course/<int:course_id>/students/", ExpectedStudentsView.as_view()),
 
@@ -25,6 +26,7 @@ urlpatterns = [
     path('institution/active-lecturers/', InstitutionActiveLecturersView.as_view()),
     path('institution/active-staff/', InstitutionActiveStaffView.as_view()),
     path('institution/students-list/', InstitutionStudentsListView.as_view()),
+    path('institution/students-list/export/', InstitutionStudentsExportView.as_view()),
     path('institution/lecturers-list/', InstitutionLecturersListView.as_view()),
     path('institution/staff-list/', InstitutionStaffListView.as_view()),
     path('institution/schedule/', InstitutionWeeklyScheduleView.as_view()),
@@ -47,7 +49,10 @@ urlpatterns = [
     path("institution/job/<int:job_id>/", JobDetailView.as_view()),
     path("institution/job/<int:job_id>/applications/", InstitutionJobApplicationsView.as_view()),
     path("institution/course/<int:course_id>/attendance/", InstitutionCourseAttendanceSummaryView.as_view()),
+    path("institution/course/<int:course_id>/attendance/export/", InstitutionCourseAttendanceExportView.as_view()),
+    path("institution/course/<int:course_id>/grades/export/", InstitutionCourseGradebookExportView.as_view()),
     path("institution/is-lecturer-free/<int:lecturer_id>/", LecturerScheduleCheckView.as_view()),
+    path("institution/free-lecturers/", InstitutionFreeLecturersView.as_view()),
     path("institution/mark-lecturer/", InstitutionAddMarkerView.as_view()),
     path("institution/marked-lecturers/", InstitutionMarkedLecturersView.as_view()),
     path("institution/is-marked/<int:lecturer_id>/", InstitutionIsMarkedView.as_view()),
@@ -63,12 +68,18 @@ urlpatterns = [
     path("lecturer/job/<int:job_id>/apply/", LecturerApplyJobView.as_view()),
     path("lecturer/course/<int:course_id>/exam/create/", LecturerCreateExamView.as_view()),
     path("lecturer/exam/<int:exam_id>/grades/", LecturerAddGradesView.as_view()),
+    path("lecturer/exam/<int:exam_id>/grades/import/", LecturerImportGradesView.as_view()),
+    path("lecturer/imports/<int:job_id>/", LecturerImportJobView.as_view()),
     path("lecturer/course/<int:course_id>/attendance/", LecturerMarkAttendanceView.as_view()),
+    path("lecturer/course/<int:course_id>/attendance/import/", LecturerImportAttendanceView.as_view()),
     path("lecturer/schedule/", LecturerWeeklyScheduleView.as_view()),
     path("lecturer/exam/<int:exam_id>/grades/edit/", LecturerEditGradesView.as_view()),
 
     path("institution-lecturer/courses/<int:course_id>/exams/", ExamsListView.as_view()),
     path("institution-lecturer/exam/<int:exam_id>/grades/view/", InstitutionOrLecturerViewGradesView.as_view()),
+    path("institution-lecturer/exam/<int:exam_id>/analytics/", InstitutionOrLecturerExamAnalyticsView.as_view()),
+    path("institution-lecturer/course/<int:course_id>/analytics/", InstitutionOrLecturerCourseAnalyticsView.as_view()),
+    path("institution-lecturer/course/<int:course_id>/lectures/", InstitutionOrLecturerCourseLecturesView.as_view()),
     path("institution-lecturer/course/<int:course_id>/attendance/<int:lecture_number>/", InstitutionOrLecturerViewLectureAttendanceView.as_view()),
 
     path("student/verify/", StudentVerificationView.as_view()),
@@ -6,21 +6,24 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 import random
-from django.core.mail import send_mail
 from django.conf import settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.generics import ListAPIView
-from ai_util.predict_doc import classify_document
-from rest_framework.pagination import PageNumberPagination
+from ai_util.client import ClassifierUnavailable, InvalidImage, classify_document
+from django.db import transaction
 from django.db.models import Q
-import datetime
+from .search import search, suggest
+from . import analytics, attendance, exports, grading, imports, lecture_calendar, outbox, scheduling
+from .feed import (
+    FEED_KINDS, InvalidCursor, decode_cursor, encode_cursor, has_more, hydrate, new_seed, plan_page,
+    session_streams,
+)
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 import stripe
 
-class FeedPagination(PageNumberPagination):
-    page_size = 20
-
 class HomeFeedView(APIView):
     permission_classes = [AllowAny]
+    page_size = 20
 
     def get(self, request):
         user = request.user if request.user.is_authenticated else None
@@ -29,141 +32,48 @@ class HomeFeedView(APIView):
 
         if user:
             city = user.city
+            # normalized tokens of the keywords/skills, computed on save
             if user.user_type == "student":
-                k = user.student.interesting_keywords
-                if k:
-                    keywords = [x.strip().lower() for x in k.split(",")]
+                keywords = user.student.search_tokens
             elif user.user_type == "lecturer":
-                k = user.lecturer.skills
-                if k:
-                    keywords = [x.strip().lower() for x in k.split(",")]
-
-        # --- GET POSTS ---
-        posts = Post.objects.all()
-        if city:
-            posts_city = posts.filter(user__city=city)
-        else:
-            posts_city = posts.none()
+                keywords = user.lecturer.search_tokens
 
-        posts_global = posts.exclude(id__in=posts_city.values_list("id", flat=True))
-
-        # --- GET COURSES ---
-        courses = Course.objects.select_related("institution", "lecturer__user")
-        if city:
-            courses_city = courses.filter(institution__user__city=city)
+        # --- CURSOR ---
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            try:
+                seed, offsets = decode_cursor(cursor)
+            except InvalidCursor:
+                return Response({"success": False, "message": "Invalid cursor."}, status=400)
         else:
-            courses_city = courses.none()
-
-        courses_kw = courses.none()
-        if user and user.user_type == "student" and keywords:
-            for kw in keywords:
-                courses_kw = courses_kw | courses.filter(title__icontains=kw)
-
-        courses_global = courses.exclude(id__in=courses_city.values_list("id", flat=True))
+            seed, offsets = new_seed(), [0] * len(FEED_KINDS)
 
-        # --- GET JOBS ---
-        jobs = JobPost.objects.select_related("institution__user")
-        if city:
-            jobs_city = jobs.filter(institution__user__city=city)
+        # --- STREAMS ---
+        # candidates are precomputed per (city, user_type, keywords) bucket,
+        # anonymous visitors get a seeded sample of recent items
+        if user:
+            streams = session_streams(seed, user.user_type, city, keywords)
         else:
-            jobs_city = jobs.none()
-
-        jobs_kw = jobs.none()
-        if user and user.user_type == "lecturer" and keywords:
-            for kw in keywords:
-                jobs_kw = jobs_kw | jobs.filter(
-                    models.Q(title__icontains=kw) |
-                    models.Q(description__icontains=kw) |
-                    models.Q(skills_required__icontains=kw)
-                )
-
-        jobs_global = jobs.exclude(id__in=jobs_city.values_list("id", flat=True))
-
-        # --- WEIGHT LOGIC ---
-        if not user:
-            post_pick = posts.order_by("?")[:10]
-            course_pick = courses.order_by("?")[:10]
-            job_pick = jobs.order_by("?")[:10]
+            streams = session_streams(seed)
 
-        else:
-            if user.user_type == "student":
-                post_pick = list(posts_city[:5]) + list(posts_global[:3])
-                course_pick = list(courses_kw[:10]) + list(courses_city[:8])
-                job_pick = list(jobs_global[:2])
+        picks, next_offsets = plan_page(streams, seed, offsets, self.page_size)
 
-            elif user.user_type == "lecturer":
-                post_pick = list(posts_city[:4]) + list(posts_global[:3])
-                course_pick = list(courses_global[:4])
-                job_pick = list(jobs_kw[:10]) + list(jobs_city[:6])
-
-            else:  # institution
-                post_pick = list(posts_city[:12]) + list(posts_global[:6])
-                course_pick = list(courses_city[:4])
-                job_pick = list(jobs_global[:3])
-
-        # --- COMBINE ---
-        feed = []
-
-        # normalize POSTS
-        for p in post_pick:
-            feed.append({
-                "type": "post",
-                "id": p.id,
-                "title": p.title,
-                "description": p.description,
-                "image": p.images.first().image.url if p.images.exists() else None,
-                "created_at": p.created_at,
-
-                "publisher_id": p.user.id,
-                "publisher_username": p.user.username,
-                "publisher_profile_image": (
-                    p.user.profile_image.url if p.user.profile_image else None
-                ),
-            })
+        feed = hydrate(picks)
 
-        # normalize COURSES
-        for c in course_pick:
-            feed.append({
-                "type": "course",
-                "id": c.id,
-                "title": c.title,
-                "description": c.about,
-                "image": c.course_image.url if c.course_image else None,
-                "created_at": datetime.datetime.combine(c.starting_date, datetime.time.min),
-
-                "publisher_id": c.institution.user.id,
-                "publisher_username": c.institution.user.username,
-                "publisher_profile_image": (
-                    c.institution.user.profile_image.url if c.institution.user.profile_image else None
-                ),
-            })
-
-        # normalize JOBS
-        for j in job_pick:
-            feed.append({
-                "type": "job",
-                "id": j.id,
-                "title": j.title,
-                "description": j.description,
-                "image": None,
-                "created_at": j.created_at,
-
-                "publisher_id": j.institution.user.id,
-                "publisher_username": j.institution.user.username,
-                "publisher_profile_image": (
-                    j.institution.user.profile_image.url if j.institution.user.profile_image else None
-                ),
-            })
-
-        # SHUFFLE
-        random.shuffle(feed)
+        next_url = None
+        if has_more(streams, next_offsets):
+            next_url = replace_query_param(
+                request.build_absolute_uri(), "cursor", encode_cursor(seed, next_offsets)
+            )
 
-        # PAGINATE
-        paginator = FeedPagination()
-        page = paginator.paginate_queryset(feed, request)
-        serializer = FeedItemSerializer(page, many=True)
+        serializer = FeedItemSerializer(feed, many=True)
 
-        return paginator.get_paginated_response(serializer.data)
+        return Response({
+            "count": sum(len(ids) for ids in streams.values()),
+            "next": next_url,
+            "previous": None,
+            "results": serializer.data,
+        })
 
 class SignupView(APIView):
     permission_classes = [AllowAny]
@@ -197,11 +107,10 @@ class LoginView(APIView):
             user.otp_code = otp
             user.otp_generated = timezone.now()
             user.save()
-            send_mail(
+            outbox.enqueue(
                 subject='رمز تسجيل الدخول',
                 message=f'رمز تسجيل الدخول الخاص بك هو\n\n{otp}\n\nسوف تنتهي صلاحية الرمز بعد 5 دقائق.',
-                from_email=settings.EMAIL_HOST_USER,
-                recipient_list=[user.email],
+                recipients=[user.email],
             )
             return Response({"success": True, "message": f"An OTP code had been sent throught email to '{user.email}'"})
         return Response({"success": False, "errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
@@ -243,7 +152,12 @@ class DocumentCheckView(APIView):
 
         file = request.FILES["file"]
 
-        doc_score, nondoc_score = classify_document(file)
+        try:
+            doc_score, nondoc_score = classify_document(file)
+        except InvalidImage as e:
+            return Response({"error": str(e)}, status=400)
+        except ClassifierUnavailable:
+            return Response({"error": "Document check is unavailable, try again later."}, status=503)
 
         return Response({
             "document_percentage": round(doc_score * 100, 2),
@@ -383,6 +297,12 @@ class InstitutionStudentsListView(ListAPIView):
 
         return qs
 
+class InstitutionStudentsExportView(InstitutionStudentsListView):
+    # same filters as the list, streamed as one CSV instead of pages
+
+    def get(self, request, *args, **kwargs):
+        return exports.students_csv(self.get_queryset())
+
 class InstitutionLecturersListView(ListAPIView):
     serializer_class = LecturerListSerializer
     permission_classes = [IsInstitution]
@@ -840,24 +760,20 @@ class InstitutionCourseAttendanceSummaryView(APIView):
 
         students = Student.objects.filter(courses=course).select_related("user")
 
+        # counters maintained by the attendance pipeline, none yet = zeros
+        stats = {s.student_id: s for s in CourseStudentStats.objects.filter(course=course)}
+
         summary = []
 
         for student in students:
-            student_atts = Attendance.objects.filter(course=course, student=student)
-
-            present = student_atts.filter(status="present").count()
-            absent  = student_atts.filter(status="absent").count()
-            late    = student_atts.filter(status="late").count()
-
-            percentage = (present / course.total_lectures) * 100 if course.total_lectures else 0
+            student_stats = stats.get(student.id)
 
             summary.append({
                 "student_id": student.id,
                 "name": f"{student.user.first_name} {student.user.last_name}",
-                "present": present,
-                "absent": absent,
-                "late": late,
-                "percentage": round(percentage, 2)
+                "present": student_stats.present if student_stats else 0,
+                "absent": student_stats.absent if student_stats else 0,
+                "percentage": round(student_stats.percentage, 2) if student_stats else 0
             })
 
         return Response({
@@ -1054,51 +970,102 @@ class LecturerAddGradesView(APIView):
         if not serializer.is_valid():
             return Response({"success": False, "errors": serializer.errors}, status=400)
 
-        grades_data = serializer.validated_data["grades"]
-        course = exam.course
-        max_score = exam.max_score
+        # the grades and their notification emails commit together
+        with transaction.atomic():
+            results, graded = grading.grade_exam(exam, serializer.validated_data["grades"])
+            outbox.enqueue_many(grading.grade_emails(exam, graded))
+
+        return Response({
+            "success": True,
+            "message": "Grades processed and emails queued.",
+            "accepted": len(graded),
+            "rejected": len(results) - len(graded),
+            "results": results,
+        })
+
+class LecturerMarkAttendanceView(APIView):
+    permission_classes = [IsLecturer, IsVerified]
+
+    def post(self, request, course_id):
+        lecturer = request.user.lecturer
+
+        try:
+            course = Course.objects.get(id=course_id, lecturer=lecturer)
+        except Course.DoesNotExist:
+            return Response({"success": False, "message": "Course not found."}, status=404)
+
+        serializer = AttendanceCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"success": False, "errors": serializer.errors}, status=400)
+
+        lecture_number = serializer.validated_data.get("lecture_number")
+        date = serializer.validated_data.get("date")
+        records = serializer.validated_data["records"]
 
-        for item in grades_data:
-            username = item["username"]
-            score = item["score"]
+        if date is not None:
+            number = lecture_calendar.lecture_number(course, date)
+            if number is None:
+                return Response({"success": False, "message": "The course has no lecture on this date."}, status=400)
+            if lecture_number is not None and lecture_number != number:
+                return Response({"success": False, "message": "The date doesn't match the lecture number."}, status=400)
+            lecture_number = number
 
-            if score < 0 or score > max_score:
-                continue
+        if lecture_number < 1 or lecture_number > course.total_lectures:
+            return Response({"success": False, "message": "Invalid lecture number."}, status=400)
 
-            try:
-                student = Student.objects.get(user__username=username, courses=course)
-            except Student.DoesNotExist:
-                continue
-
-            grade, _ = Grade.objects.update_or_create(
-                exam=exam,
-                student=student,
-                defaults={"score": score}
-            )
+        # the attendance and the absence alerts commit together
+        with transaction.atomic():
+            results, newly_absent = attendance.mark_lecture(course, lecture_number, records)
 
-            user = student.user
-            subject = f"Grade for {exam.title} - {course.title}"
-            msg = (
-                f"Dear {user.first_name},\n\n"
-                f"Your score for exam '{exam.title}' in course '{course.title}' is {score}/{max_score}.\n\n"
-                f"Best regards."
-            )
+            # only students who weren't already absent are alerted, so
+            # re-submitting a lecture doesn't email everyone again
+            alerts = outbox.enqueue_many(attendance.absence_emails(course, lecture_number, newly_absent))
 
-            recipients = [user.email]
-            if student.responsible_email:
-                recipients.append(student.responsible_email)
+        accepted = sum(result["accepted"] for result in results)
 
-            send_mail(
-                subject=subject,
-                message=msg,
-                from_email=settings.EMAIL_HOST_USER,
-                recipient_list=recipients,
-                fail_silently=True,
-            )
+        return Response({
+            "success": True,
+            "message": "Attendance saved successfully.",
+            "accepted": accepted,
+            "rejected": len(results) - accepted,
+            "absence_alerts": alerts,
+            "results": results,
+        })
 
-        return Response({"success": True, "message": "Grades processed and emails sent."})
+class LecturerImportGradesView(APIView):
+    permission_classes = [IsLecturer, IsVerified]
 
-class LecturerMarkAttendanceView(APIView):
+    def post(self, request, exam_id):
+        lecturer = request.user.lecturer
+
+        try:
+            exam = Exam.objects.select_related("course").get(id=exam_id, course__lecturer=lecturer)
+        except Exam.DoesNotExist:
+            return Response({"success": False, "message": "Exam not found."}, status=404)
+
+        serializer = ImportUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"success": False, "errors": serializer.errors}, status=400)
+
+        file = serializer.validated_data["file"]
+
+        # large files are imported in the background
+        if file.size > imports.IMPORT_INLINE_MAX_BYTES:
+            job = ImportJob.objects.create(kind="grades", created_by=request.user, exam=exam, file=file)
+            return Response({
+                "success": True,
+                "message": "The file is being imported.",
+                "job": ImportJobSerializer(job).data,
+            }, status=202)
+
+        try:
+            summary = imports.import_grades(exam, file, file.name)
+        except imports.InvalidImport as e:
+            return Response({"success": False, "message": str(e)}, status=400)
+
+        return Response({"success": True, "message": "Grades imported and emails queued.", **summary})
+
+class LecturerImportAttendanceView(APIView):
     permission_classes = [IsLecturer, IsVerified]
 
     def post(self, request, course_id):
@@ -1109,53 +1076,70 @@ class LecturerMarkAttendanceView(APIView):
         except Course.DoesNotExist:
             return Response({"success": False, "message": "Course not found."}, status=404)
 
-        serializer = AttendanceCreateSerializer(data=request.data)
+        serializer = AttendanceImportSerializer(data=request.data)
         if not serializer.is_valid():
             return Response({"success": False, "errors": serializer.errors}, status=400)
 
+        file = serializer.validated_data["file"]
         lecture_number = serializer.validated_data["lecture_number"]
-        records = serializer.validated_data["records"]
 
         if lecture_number < 1 or lecture_number > course.total_lectures:
             return Response({"success": False, "message": "Invalid lecture number."}, status=400)
 
-        for rec in records:
-            username = rec["username"]
-            status_val = rec["status"]
-
-            try:
-                student = Student.objects.get(user__username=username, courses=course)
-            except Student.DoesNotExist:
-                continue
-
-            Attendance.objects.update_or_create(
-                course=course,
-                student=student,
-                lecture_number=lecture_number,
-                defaults={"status": status_val}
+        # large files are imported in the background
+        if file.size > imports.IMPORT_INLINE_MAX_BYTES:
+            job = ImportJob.objects.create(
+                kind="attendance", created_by=request.user, course=course, lecture_number=lecture_number, file=file
             )
+            return Response({
+                "success": True,
+                "message": "The file is being imported.",
+                "job": ImportJobSerializer(job).data,
+            }, status=202)
 
-            # send email only if absent
-            if status_val == "absent":
-                subject = f"Attendance Alert - {course.title} Lecture {lecture_number}"
-                msg = (
-                    f"Dear {student.user.first_name},\n\n"
-                    f"You were marked absent for lecture {lecture_number} of '{course.title}'.\n"
-                    f"Please make sure to catch up.\n\nBest regards."
-                )
-                recipients = [student.user.email]
-                if student.responsible_email:
-                    recipients.append(student.responsible_email)
-
-                send_mail(
-                    subject=subject,
-                    message=msg,
-                    from_email=settings.EMAIL_HOST_USER,
-                    recipient_list=recipients,
-                    fail_silently=True,
-                )
+        try:
+            summary = imports.import_attendance(course, lecture_number, file, file.name)
+        except imports.InvalidImport as e:
+            return Response({"success": False, "message": str(e)}, status=400)
+
+        return Response({"success": True, "message": "Attendance imported successfully.", **summary})
+
+class LecturerImportJobView(APIView):
+    permission_classes = [IsLecturer, IsVerified]
 
-        return Response({"success": True, "message": "Attendance saved successfully."})
+    def get(self, request, job_id):
+        try:
+            job = ImportJob.objects.get(id=job_id, created_by=request.user)
+        except ImportJob.DoesNotExist:
+            return Response({"success": False, "message": "Import not found."}, status=404)
+
+        return Response({"success": True, "job": ImportJobSerializer(job).data})
+
+class InstitutionCourseAttendanceExportView(APIView):
+    permission_classes = [IsInstitution]
+
+    def get(self, request, course_id):
+        institution = request.user.institution
+
+        try:
+            course = Course.objects.get(id=course_id, institution=institution)
+        except Course.DoesNotExist:
+            return Response({"success": False, "message": "Course not found."}, status=404)
+
+        return exports.attendance_csv(course)
+
+class InstitutionCourseGradebookExportView(APIView):
+    permission_classes = [IsInstitution]
+
+    def get(self, request, course_id):
+        institution = request.user.institution
+
+        try:
+            course = Course.objects.get(id=course_id, institution=institution)
+        except Course.DoesNotExist:
+            return Response({"success": False, "message": "Course not found."}, status=404)
+
+        return exports.gradebook_csv(course)
 
 class InstitutionOrLecturerViewLectureAttendanceView(APIView):
     permission_classes = [IsAuthenticated, IsVerified]
@@ -1258,6 +1242,93 @@ class InstitutionOrLecturerViewGradesView(APIView):
             "grades": data
         })
 
+class InstitutionOrLecturerExamAnalyticsView(APIView):
+    permission_classes = [IsVerified]  # We'll do manual type checks
+
+    def get(self, request, exam_id):
+        user = request.user
+
+        try:
+            exam = Exam.objects.select_related("course").get(id=exam_id)
+        except Exam.DoesNotExist:
+            return Response({"success": False, "message": "Exam not found."}, status=404)
+
+        # Permission check
+        if user.user_type == "lecturer":
+            if exam.course.lecturer_id != user.lecturer.id:
+                return Response({"success": False, "message": "Not allowed."}, status=403)
+        elif user.user_type == "institution":
+            if exam.course.institution_id != user.institution.id:
+                return Response({"success": False, "message": "Not allowed."}, status=403)
+        else:
+            return Response({"success": False, "message": "Not allowed."}, status=403)
+
+        return Response({
+            "success": True,
+            "exam_title": exam.title,
+            "course": exam.course.title,
+            "max_score": exam.max_score,
+            "analytics": analytics.exam_analytics(exam),
+        })
+
+class InstitutionOrLecturerCourseAnalyticsView(APIView):
+    permission_classes = [IsVerified]  # We'll do manual type checks
+
+    def get(self, request, course_id):
+        user = request.user
+
+        try:
+            course = Course.objects.get(id=course_id)
+        except Course.DoesNotExist:
+            return Response({"success": False, "message": "Course not found."}, status=404)
+
+        # Permission check
+        if user.user_type == "lecturer":
+            if course.lecturer_id != user.lecturer.id:
+                return Response({"success": False, "message": "Not allowed."}, status=403)
+        elif user.user_type == "institution":
+            if course.institution_id != user.institution.id:
+                return Response({"success": False, "message": "Not allowed."}, status=403)
+        else:
+            return Response({"success": False, "message": "Not allowed."}, status=403)
+
+        return Response({
+            "success": True,
+            "course": course.title,
+            "analytics": analytics.course_analytics(course),
+        })
+
+class InstitutionOrLecturerCourseLecturesView(APIView):
+    permission_classes = [IsVerified]  # We'll do manual type checks
+
+    def get(self, request, course_id):
+        user = request.user
+
+        try:
+            course = Course.objects.get(id=course_id)
+        except Course.DoesNotExist:
+            return Response({"success": False, "message": "Course not found."}, status=404)
+
+        # Permission check
+        if user.user_type == "lecturer":
+            if course.lecturer_id != user.lecturer.id:
+                return Response({"success": False, "message": "Not allowed."}, status=403)
+        elif user.user_type == "institution":
+            if course.institution_id != user.institution.id:
+                return Response({"success": False, "message": "Not allowed."}, status=403)
+        else:
+            return Response({"success": False, "message": "Not allowed."}, status=403)
+
+        return Response({
+            "success": True,
+            "course": course.title,
+            "total_lectures": course.total_lectures,
+            "lectures": [
+                {"lecture_number": number, "date": date}
+                for number, date in lecture_calendar.course_lectures(course)
+            ],
+        })
+
 class LecturerEditGradesView(APIView):
     permission_classes = [IsLecturer, IsVerified]
 
@@ -1276,32 +1347,14 @@ class LecturerEditGradesView(APIView):
         if not serializer.is_valid():
             return Response({"success": False, "errors": serializer.errors}, status=400)
 
-        grades_data = serializer.validated_data["grades"]
-        course = exam.course
-        max_score = exam.max_score
-
-        for item in grades_data:
-            username = item["username"]
-            score = item["score"]
-
-            # Validate score
-            if score < 0 or score > max_score:
-                continue
-
-            try:
-                student = Student.objects.get(user__username=username, courses=course)
-            except Student.DoesNotExist:
-                continue
-
-            Grade.objects.update_or_create(
-                exam=exam,
-                student=student,
-                defaults={"score": score}
-            )
+        results, graded = grading.grade_exam(exam, serializer.validated_data["grades"])
 
         return Response({
             "success": True,
-            "message": "Grades updated successfully."
+            "message": "Grades updated successfully.",
+            "accepted": len(graded),
+            "rejected": len(results) - len(graded),
+            "results": results,
         })
 
 class StudentSelfProfileView(APIView):
@@ -1509,7 +1562,7 @@ class StudentViewAttendanceView(APIView):
         ]
 
         total = course.total_lectures
-        present = records.filter(status="present").count()
+        present = sum(rec["status"] == "present" for rec in data)
 
         percentage = round((present / total) * 100, 2) if total > 0 else 0
 
@@ -1610,13 +1663,10 @@ class CourseProgressView(APIView):
             if not student.courses.filter(id=course.id).exists():
                 return Response({"success": False, "message": "You are not enrolled in this course."}, status=403)
 
-            present = Attendance.objects.filter(
-                course=course,
-                student=student,
-                status="present"
-            ).count()
+            stats = attendance.get_student_stats(course, student)
+            present = stats.present
 
-            percentage = round((present / total_lectures) * 100, 2)
+            percentage = round(stats.percentage, 2)
 
             return Response({
                 "success": True,
@@ -1629,9 +1679,9 @@ class CourseProgressView(APIView):
             })
 
         # LECTURER / INSTITUTION / VISITOR → OVERALL AVERAGE PROGRESS
-        students = Student.objects.filter(courses=course)
+        student_count = course.students.count()
 
-        if not students.exists():
+        if not student_count:
             return Response({
                 "success": True,
                 "progress": {
@@ -1642,18 +1692,11 @@ class CourseProgressView(APIView):
                 }
             })
 
-        total_present = 0
-
-        for st in students:
-            total_present += Attendance.objects.filter(
-                course=course,
-                student=st,
-                status="present"
-            ).count()
+        total_present = attendance.enrolled_present(course)
 
         # average = total present / (#students × total lectures)
         avg_percentage = round(
-            (total_present / (students.count() * total_lectures)) * 100,
+            (total_present / (student_count * total_lectures)) * 100,
             2
         )
 
@@ -1714,125 +1757,104 @@ class NotificationsView(APIView):
 
 class ExploreSearchView(APIView):
     permission_classes = [AllowAny]  # public search
+    page_size = 20       # per page when filtering by type
+    group_size = 10      # default per type in the grouped results
+    max_group_size = 20
 
     def get(self, request):
         q = request.query_params.get("q", "").strip().lower()
         filter_type = request.query_params.get("filter", "").lower()
 
-        # Get user city (if logged in)
-        user_city = None
-        if request.user.is_authenticated:
-            user_city = request.user.city.lower()
-
-        # Helper: prioritize results by city
-        def prioritize_city(queryset, city_field):
-            if not user_city:
-                return queryset  # no prioritization
-            return sorted(
-                queryset,
-                key=lambda item: 0 if city_field(item).lower() == user_city else 1
-            )
+        # Matches from the user's city (if logged in) are ranked first
+        user_city = request.user.city if request.user.is_authenticated else None
 
         # -------------------------
-        # FETCHERS FOR EACH MODEL
+        # SOURCES FOR EACH MODEL
         # -------------------------
+        sources = {
+            "students": (Student.objects.select_related("user"), SearchStudentSerializer),
+            "lecturers": (
+                Lecturer.objects.select_related("user").prefetch_related("institutions"),
+                SearchLecturerSerializer,
+            ),
+            "institutions": (Institution.objects.select_related("user"), SearchInstitutionSerializer),
+            "courses": (
+                Course.objects.select_related("institution__user").defer("institution__search_vector"),
+                SearchCourseSerializer,
+            ),
+            "jobs": (
+                JobPost.objects.select_related("institution__user").defer("institution__search_vector"),
+                SearchJobSerializer,
+            ),
+        }
 
-        # STUDENTS
-        def fetch_students():
-            qs = Student.objects.filter(
-                Q(user__first_name__icontains=q) |
-                Q(user__last_name__icontains=q) |
-                Q(interesting_keywords__icontains=q)
-            ).select_related("user")
-            return prioritize_city(qs, lambda x: x.user.city)
-
-        # LECTURERS
-        def fetch_lecturers():
-            qs = Lecturer.objects.filter(
-                Q(user__first_name__icontains=q) |
-                Q(user__last_name__icontains=q) |
-                Q(specialty__icontains=q) |
-                Q(skills__icontains=q)
-            ).select_related("user")
-            return prioritize_city(qs, lambda x: x.user.city)
-
-        # INSTITUTIONS
-        def fetch_institutions():
-            qs = Institution.objects.filter(
-                Q(title__icontains=q) |
-                Q(location__icontains=q) |
-                Q(user__city__icontains=q)
-            ).select_related("user")
-            return prioritize_city(qs, lambda x: x.user.city)
-
-        # COURSES
-        def fetch_courses():
-            qs = Course.objects.filter(
-                Q(title__icontains=q) |
-                Q(about__icontains=q)
-            ).select_related("institution__user")
-            return prioritize_city(qs, lambda x: x.institution.user.city)
-
-        # JOBS
-        def fetch_jobs():
-            qs = JobPost.objects.filter(
-                Q(title__icontains=q) |
-                Q(description__icontains=q) |
-                Q(skills_required__icontains=q) |
-                Q(experience_required__icontains=q) |
-                Q(specialty__icontains=q)
-            ).select_related("institution__user")
-            return prioritize_city(qs, lambda x: x.institution.user.city)
+        # one extra row tells whether there is more after this slice
+        def fetch(name, offset, limit):
+            queryset, serializer_class = sources[name]
+            rows = list(search(queryset, q, user_city)[offset:offset + limit + 1])
+            return serializer_class(rows[:limit], many=True).data, len(rows) > limit
 
+        def offset_url(name, offset):
+            url = remove_query_param(request.build_absolute_uri(), "page")
+            url = replace_query_param(url, "filter", name)
+            return replace_query_param(url, "offset", offset)
 
         # -------------------------------
         # APPLY FILTER (if provided)
         # -------------------------------
         if filter_type:
-            if filter_type == "students":
-                return Response({
-                    "success": True,
-                    "students": SearchStudentSerializer(fetch_students(), many=True).data
-                })
-
-            if filter_type == "lecturers":
-                return Response({
-                    "success": True,
-                    "lecturers": SearchLecturerSerializer(fetch_lecturers(), many=True).data
-                })
+            if filter_type not in sources:
+                return Response({"success": False, "message": "Invalid filter."}, status=400)
 
-            if filter_type == "institutions":
-                return Response({
-                    "success": True,
-                    "institutions": SearchInstitutionSerializer(fetch_institutions(), many=True).data
-                })
-
-            if filter_type == "courses":
-                return Response({
-                    "success": True,
-                    "courses": SearchCourseSerializer(fetch_courses(), many=True).data
-                })
+            # "offset" comes from the grouped "more" links, "page" is kept
+            # for older clients
+            try:
+                if "offset" in request.query_params:
+                    offset = max(int(request.query_params["offset"]), 0)
+                else:
+                    offset = (max(int(request.query_params.get("page", 1)), 1) - 1) * self.page_size
+            except ValueError:
+                offset = 0
 
-            if filter_type == "jobs":
-                return Response({
-                    "success": True,
-                    "jobs": SearchJobSerializer(fetch_jobs(), many=True).data
-                })
+            data, more = fetch(filter_type, offset, self.page_size)
 
-            return Response({"success": False, "message": "Invalid filter."}, status=400)
+            return Response({
+                "success": True,
+                filter_type: data,
+                "offset": offset,
+                "next": offset_url(filter_type, offset + self.page_size) if more else None,
+            })
 
         # -------------------------------
         # NO FILTER → RETURN GROUPED
         # -------------------------------
+        try:
+            limit = min(max(int(request.query_params.get("limit", self.group_size)), 1), self.max_group_size)
+        except ValueError:
+            limit = self.group_size
+
+        # five LIMITed index scans, one after the other on the request's
+        # connection (see benchmark_explore_groups)
+        groups = {name: fetch(name, 0, limit) for name in sources}
+
         return Response({
             "success": True,
-            "results": {
-                "students": SearchStudentSerializer(fetch_students(), many=True).data,
-                "lecturers": SearchLecturerSerializer(fetch_lecturers(), many=True).data,
-                "institutions": SearchInstitutionSerializer(fetch_institutions(), many=True).data,
-                "courses": SearchCourseSerializer(fetch_courses(), many=True).data,
-                "jobs": SearchJobSerializer(fetch_jobs(), many=True).data,
-            }
+            "results": {name: data for name, (data, _) in groups.items()},
+            "more": {
+                name: offset_url(name, limit) if more else None
+                for name, (_, more) in groups.items()
+            },
+        })
+
+class ExploreSuggestView(APIView):
+    permission_classes = [AllowAny]  # public typeahead
+
+    def get(self, request):
+        q = request.query_params.get("q", "")
+
+        return Response({
+            "success": True,
+            "suggestions": suggest(q),
         })
 
 class StudentVerificationView(APIView):
@@ -1877,21 +1899,6 @@ class LecturerVerificationView(APIView):
 
         return Response({"success": False, "errors": serializer.errors}, status=400)
 
-def find_conflict(existing_courses, days, start_time, end_time):
-    for course in existing_courses:
-        for day in course.days:
-            if day in days:
-                if not (end_time <= course.start_time or start_time >= course.end_time):
-                    return {
-                        "course_id": course.id,
-                        "course_title": course.title,
-                        "institution": course.institution.title,
-                        "institution_username": course.institution.user.username,
-                        "day": day,
-                        "time": f"{course.start_time.strftime('%H:%M')} - {course.end_time.strftime('%H:%M')}"
-                    }
-    return None
-
 class StudentScheduleCheckView(APIView):
     permission_classes = [IsVerified, IsStudent]
 
@@ -1904,13 +1911,15 @@ class StudentScheduleCheckView(APIView):
             return Response({"success": False, "message": "Course not found."}, status=404)
 
         student = user.student
-        existing_courses = student.courses.all()
 
-        conflict = find_conflict(
-            existing_courses,
+        conflict = scheduling.find_conflict(
+            student.courses.all(),
             new_course.days,
             new_course.start_time,
-            new_course.end_time
+            new_course.end_time,
+            new_course.starting_date,
+            new_course.ending_date,
+            exclude=new_course.id,
         )
 
         if conflict:
@@ -1927,29 +1936,47 @@ class LecturerScheduleCheckView(APIView):
         except Lecturer.DoesNotExist:
             return Response({"success": False, "message": "Lecturer not found."}, status=404)
 
-        days = request.data.get("days", [])
-        start_time = request.data.get("start_time")
-        end_time = request.data.get("end_time")
-
-        if not days or not start_time or not end_time:
-            return Response({"success": False, "message": "days, start_time, end_time required."}, status=400)
-
-        # Convert times
-        from datetime import time
-        h1, m1 = map(int, start_time.split(":"))
-        h2, m2 = map(int, end_time.split(":"))
-        start_time = time(h1, m1)
-        end_time = time(h2, m2)
-
-        existing_courses = lecturer.courses.all()
+        serializer = ScheduleSlotSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"success": False, "errors": serializer.errors}, status=400)
 
-        conflict = find_conflict(existing_courses, days, start_time, end_time)
+        conflict = scheduling.find_conflict(lecturer.courses.all(), **serializer.validated_data)
 
         if conflict:
             return Response({"success": False, "contradiction": conflict})
 
         return Response({"success": True, "contradiction": None})
 
+class InstitutionFreeLecturersView(APIView):
+    permission_classes = [IsVerified & IsInstitution]
+
+    def post(self, request):
+        institution = request.user.institution
+
+        serializer = FreeLecturersSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"success": False, "errors": serializer.errors}, status=400)
+
+        # lecturers affiliated with, teaching at or marked by the institution
+        lecturers = Lecturer.objects.filter(
+            Q(institutions=institution) | Q(courses__institution=institution) | Q(marked_by_institutions=institution)
+        ).distinct().select_related("user")
+
+        free, busy = scheduling.free_lecturers(lecturers, **serializer.validated_data)
+
+        return Response({
+            "success": True,
+            "free": LecturerSimpleSerializer(free, many=True).data,
+            "busy": [
+                {
+                    "lecturer": LecturerSimpleSerializer(lecturer).data,
+                    "reason": "contradiction" if contradiction else "outside_free_time",
+                    "contradiction": contradiction,
+                }
+                for lecturer, contradiction in busy
+            ],
+        })
+
 class ExpectedStudentsView(APIView):
     permission_classes = [IsAuthenticated, IsLecturer | IsInstitution]
 
@@ -51,6 +51,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'corsheaders',
     'api',
@@ -110,14 +111,38 @@ DATABASES = {
     }
 }
 
+# Cache (materialized home feed pools and buckets, analytics versions)
+# Shared by every gunicorn worker and the mailer/importer/classifier processes,
+# so it defaults to the compose redis service. A LocMemCache is only correct
+# for a single local process.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.redis.RedisCache'),
+        'LOCATION': config('CACHE_LOCATION', default='redis://redis:6379/1'),
+    }
+}
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.gmail.com'
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
+EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_ADDRESS')
 EMAIL_HOST_PASSWORD = config('EMAIL_PASSWORD')
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# Document classifier worker (python manage.py run_classifier). Unset, the
+# model is loaded lazily inside the web process instead.
+CLASSIFIER_SOCKET = config('CLASSIFIER_SOCKET', default='')
+CLASSIFIER_TIMEOUT = config('CLASSIFIER_TIMEOUT', default=30, cast=float)
+# images per forward pass, and how long the first image of a batch may wait for more
+CLASSIFIER_MAX_BATCH_SIZE = config('CLASSIFIER_MAX_BATCH_SIZE', default=16, cast=int)
+CLASSIFIER_MAX_WAIT_MS = config('CLASSIFIER_MAX_WAIT_MS', default=10, cast=float)
+# "torch" (ultralytics .pt) or "onnx" (ai/train/export_onnx.py, no torch needed)
+CLASSIFIER_BACKEND = config('CLASSIFIER_BACKEND', default='torch')
+CLASSIFIER_ONNX_PATH = config('CLASSIFIER_ONNX_PATH', default='')  # defaults to ai_util/document_classifier_v3.onnx
+CLASSIFIER_THREADS = config('CLASSIFIER_THREADS', default=0, cast=int)  # per forward pass, 0 = all cores
+CLASSIFIER_CACHE_SIZE = config('CLASSIFIER_CACHE_SIZE', default=1024, cast=int)  # cached results, 0 = no cache
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -213,7 +238,7 @@ LOGGING = {
         'email': {
             'level': 'ERROR',
             'class': 'logging.handlers.SMTPHandler',
-            'mailhost': ('smtp.gmail.com', 587),
+            'mailhost': (EMAIL_HOST, EMAIL_PORT),
             'fromaddr': DEFAULT_FROM_EMAIL,
             'toaddrs': [email for _, email in ADMINS],
             'subject': '[Django ERROR]',